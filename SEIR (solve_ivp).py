@@ -6,6 +6,9 @@ import matplotlib.pyplot as plt
 from scipy.integrate import solve_ivp
 from matplotlib.widgets import Slider
 
+from events import for_solve_ivp, from_solve_ivp, milestones, summary
+from models import SEIR
+
 # Configuration de l'affichage de matplotlib
 # matplotlib.use('Qt5Agg') # A utiliser sur Linux
 matplotlib.use('TkAgg') # A utiliser sur Windows
@@ -16,13 +19,39 @@ matplotlib.use('TkAgg') # A utiliser sur Windows
 def deriv(_t, y, alpha, beta, gamma, micro, nu):
     """
     Methode regroupant les équations differentielles du modèle SEIR.
+    Vectorisée : y peut être de forme (4, k) pour évaluer k états d'un coup.
+    """
+    return SEIR.rhs(y, (alpha, beta, gamma, micro, nu))
+
+
+# Jacobien analytique, utilisé par les méthodes implicites
+def jacobian(_t, y, alpha, beta, gamma, micro, nu):
+    return SEIR.jacobian(y, (alpha, beta, gamma, micro, nu))
+
+
+def solve(alpha, beta, gamma, micro, nu):
+    """
+    Résolution sur la grille t. La sortie dense est inutile : t_eval couvre déjà l'affichage.
+    Retourne les courbes et les étapes clés (pic des infectés, immunité collective...) localisées par solve_ivp.
+    """
+    # Les méthodes explicites n'acceptent pas jac (solve_ivp avertirait à chaque résolution)
+    options = {"jac": jacobian} if SIM_METHOD in IMPLICIT_METHODS else {}
+    params = (alpha, beta, gamma, micro, nu)
+    events = milestones(SEIR, params)
+    solution = solve_ivp(fun=deriv, t_span=(0, SIM_TIME), t_eval=t, y0=(S0, E0, I0, R0), method=SIM_METHOD,
+                         vectorized=True, rtol=SIM_RTOL, atol=SIM_ATOL, args=params,
+                         events=for_solve_ivp(SEIR, params, events), **options)
+    return solution.y, summary(SEIR, from_solve_ivp(solution, events))
+
+
+def show_peak(found):
+    """
+    Place le marqueur du pic des infectés (l'axe des abscisses compte les points de la grille t).
     """
-    S, E, I, R = y
-    dSdt = -beta * S * I + nu * (S + E + I + R) - micro * S
-    dEdt = beta * S * I - alpha * E - micro * E
-    dIdt = alpha * E - (gamma + micro) * I
-    dRdt = gamma * I - micro * R
-    return dSdt, dEdt, dIdt, dRdt
+    if found["t_peak"] is None:
+        peak.set_data([], [])
+    else:
+        peak.set_data([found["t_peak"] * (len(t) - 1) / SIM_TIME], [found["peak_I"]])
 
 
 # The function to be called anytime a slider's value changes
@@ -30,9 +59,8 @@ def update(_x):
     """
     Méthode appelée a chaque changement des sliders. Recalcule les courbes et les affiche.
     """
-    solution = solve_ivp(fun=deriv, t_span=(0, SIM_TIME), t_eval=t, dense_output=True, y0=(S0, E0, I0, R0), method='DOP853',
-                         args=(alpha_slider.val, beta_slider.val, gamma_slider.val, micro_slider.val, nu_slider.val))
-    S, E, I, R = solution.y
+    (S, E, I, R), found = solve(alpha_slider.val, beta_slider.val, gamma_slider.val, micro_slider.val, nu_slider.val)
+    show_peak(found)
     line1.set_ydata(S)
     line2.set_ydata(I)
     line3.set_ydata(R)
@@ -45,6 +73,13 @@ def update(_x):
 # --- Paramètres Initiaux ---
 SIM_TIME = 100  # Simulation time
 SIM_PRECISION = 20  # Samples per day
+# Méthode de solve_ivp : DOP853, RK45 (explicites) ou LSODA, Radau, BDF (implicites, pour les régions
+# raides à forte mortalité ou natalité, où elles sont bien plus rapides). LSODA bascule seule entre
+# explicite et implicite.
+SIM_METHOD = "DOP853"
+SIM_RTOL = 1e-3  # Tolérances par défaut de solve_ivp
+SIM_ATOL = 1e-6
+IMPLICIT_METHODS = ("LSODA", "Radau", "BDF")
 
 N0 = 1000  # Population
 E0 = 0  # Nombre initial de personnes infectées non-infectieuses
@@ -68,9 +103,7 @@ ax.margins(x=0)
 ax.autoscale(True)
 
 # Résolution des équations différentielles avec les paramètres Initiaux
-ret = solve_ivp(fun=deriv, t_span=(0, SIM_TIME), t_eval=t, dense_output=True, y0=(S0, E0, I0, R0), method='DOP853',
-                args=(INIT_ALPHA, INIT_BETA, INIT_GAMMA, INIT_MICRO, INIT_NU))
-S, E, I, R = ret.y
+(S, E, I, R), found = solve(INIT_ALPHA, INIT_BETA, INIT_GAMMA, INIT_MICRO, INIT_NU)
 
 # Ajout des courbes d'évolution avec leurs labels
 line1, = plt.plot(S, label="Susceptible")
@@ -79,6 +112,8 @@ line3, = plt.plot(R, label="Recovered with Immunity")
 line4, = plt.plot(E, label="Exposed")
 N = [S[i] + E[i] + I[i] + R[i] for i in range(len(S))]
 line5, = plt.plot(N, label="Population")
+peak, = plt.plot([], [], "o", color=line2.get_color(), label="Pic des infectés")
+show_peak(found)
 
 # Ajustement des tracés principaux pour faire de la place aux sliders
 plt.subplots_adjust(left=0.1, bottom=0.5, top=1)
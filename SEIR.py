@@ -1,7 +1,15 @@
+import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider
 
+from background import BackgroundSolver
+from cache import memoize
+from downsample import lttb
+from integrators import integrate
+from models import SEIR
+from surrogate import Surrogate
+
 # Configuration de l'affichage de matplotlib
 # matplotlib.use('Qt5Agg') # A utiliser sur Linux
 matplotlib.use('TkAgg') # A utiliser sur Windows
@@ -23,59 +31,78 @@ S0 = N0 - (I0 + R0 + E0)  # Nombre initial de personnes Saines
 # Precision et durée de la simulation
 SIM_PRECISION = 1000
 SIM_MULTIPLIER = 2
+SIM_METHOD = "euler"  # euler, heun, midpoint, rk4 ou à pas adaptatif : heun_euler, bogacki_shampine
+SIM_EVERY = 2  # Un point gardé tous les SIM_EVERY pas : la sortie ne dépend pas du pas d'intégration
+PREVIEW_FACTOR = 25  # L'aperçu affiché pendant un glissement garde un point sur PREVIEW_FACTOR
+PREVIEW_MAX_STEPS = 1000  # Au-delà (système raide ou explosif), l'aperçu passe au pas fixe grossier
+SURROGATE = None  # Grille précalculée par surrogate.py (chemin sans extension) pour un aperçu instantané
+
+surrogate = Surrogate(SURROGATE) if SURROGATE else None
 
 
+@memoize(config=lambda: (SIM_PRECISION, SIM_MULTIPLIER, SIM_METHOD, SIM_EVERY))
 def solve(S0, E0, I0, R0, alpha, beta, gamma, micro, nu):
-    S, E, I, R = [S0], [E0], [I0], [R0]
-    h = 1/SIM_PRECISION
-    for o in range(SIM_PRECISION*SIM_MULTIPLIER):
-        St, Et, It, Rt = S[o-1], E[o-1], I[o-1], R[o-1]
+    return integrate(SEIR, (S0, E0, I0, R0), (alpha, beta, gamma, micro, nu), 1/SIM_PRECISION, SIM_PRECISION*SIM_MULTIPLIER, SIM_METHOD, every=SIM_EVERY).T
 
-        #Equations
-        dSdt = -beta*St*It + nu*(St+Et+It+Rt) - micro*St
-        dEdt = beta*St*It - alpha*Et - micro*Et
-        dIdt = alpha*Et - gamma*It - micro*It
-        dRdt = gamma*It - micro*Rt
 
-        S.append(St+h* dSdt)
-        E.append(Et+h* dEdt)
-        I.append(It+h* dIdt)
-        R.append(Rt+h* dRdt)
-    return S, E, I, R
+def preview(S0, E0, I0, R0, alpha, beta, gamma, micro, nu):
+    """
+    Solution approchée peu coûteuse : interpolée dans la grille précalculée si elle couvre ces paramètres,
+    sinon pas adaptatif à tolérance large, un point sur PREVIEW_FACTOR. Si le pas adaptatif
+    n'aboutit pas en PREVIEW_MAX_STEPS pas, euler au pas de la sortie : le coût reste borné.
+    """
+    if surrogate is not None and surrogate.covers((alpha, beta, gamma, micro, nu), (S0, E0, I0, R0), 1/SIM_PRECISION, SIM_PRECISION*SIM_MULTIPLIER, SIM_EVERY, SIM_METHOD):
+        return surrogate(alpha, beta, gamma, micro, nu)
+    try:
+        return integrate(SEIR, (S0, E0, I0, R0), (alpha, beta, gamma, micro, nu), PREVIEW_FACTOR/SIM_PRECISION, SIM_PRECISION*SIM_MULTIPLIER//PREVIEW_FACTOR, "bogacki_shampine", rtol=1e-2, max_steps=PREVIEW_MAX_STEPS).T
+    except RuntimeError:
+        return integrate(SEIR, (S0, E0, I0, R0), (alpha, beta, gamma, micro, nu), PREVIEW_FACTOR/SIM_PRECISION, SIM_PRECISION*SIM_MULTIPLIER//PREVIEW_FACTOR, "euler").T
+
+
+def draw(curves):
+    """
+    Affiche des courbes calculées en arrière-plan (aperçu ou solution complète),
+    réduites par LTTB : le coût du tracé ne dépend pas de la finesse de la résolution.
+    """
+    S, E, I, R = curves
+    x = np.linspace(0, SIM_PRECISION*SIM_MULTIPLIER, len(S))
+    line1.set_data(*lttb(x, S))
+    line2.set_data(*lttb(x, E))
+    line3.set_data(*lttb(x, I))
+    line4.set_data(*lttb(x, R))
+    line5.set_data(*lttb(x, S + E + I + R))
+    fig.canvas.draw_idle()
 
 
 # The function to be called anytime a slider's value changes
 def update(_x):
     """
-    Méthode appelée a chaque changement des sliders. Recalcule les courbes et les affiche.
+    Méthode appelée a chaque changement des sliders. Demande le recalcul des courbes en arrière-plan.
     """
-    S, E, I, R = solve(S0, E0, I0, R0, alpha_slider.val, beta_slider.val, gamma_slider.val, micro_slider.val, nu_slider.val)
-    line1.set_ydata(S)
-    line2.set_ydata(E)
-    line3.set_ydata(I)
-    line4.set_ydata(R)
-    N = [S[i] + E[i] + I[i] + R[i] for i in range(len(S))]
-    line5.set_ydata(N)
-    fig.canvas.draw_idle()
+    background.submit(S0, E0, I0, R0, alpha_slider.val, beta_slider.val, gamma_slider.val, micro_slider.val, nu_slider.val)
 
 
 S, E, I, R = solve(S0, E0, I0, R0, INIT_ALPHA, INIT_BETA, INIT_GAMMA, INIT_MICRO, INIT_NU)
 N = [S[i] + E[i] + I[i] + R[i] for i in range(len(S))]
+x = np.linspace(0, SIM_PRECISION*SIM_MULTIPLIER, len(S))
 
 fig, ax = plt.subplots()
 ax.margins(x=0)
 
-line1, = plt.plot(S, label="Sains")
-line2, = plt.plot(E, label="Exposed")
-line3, = plt.plot(I, label="Infectes")
-line4, = plt.plot(R, label="Recovered")
-line5, = plt.plot(N, label="Population")
+line1, = plt.plot(*lttb(x, S), label="Sains")
+line2, = plt.plot(*lttb(x, E), label="Exposed")
+line3, = plt.plot(*lttb(x, I), label="Infectes")
+line4, = plt.plot(*lttb(x, R), label="Recovered")
+line5, = plt.plot(*lttb(x, N), label="Population")
 
 # Ajustement des tracés principaux pour faire de la place aux sliders
 plt.subplots_adjust(left=0.1, bottom=0.5, top=1)
 ax.set_xlabel('Time [days]')
 ax.legend()
 
+# Résolution en arrière-plan : l'interface reste fluide pendant le glissement des sliders
+background = BackgroundSolver(fig, solve, draw, preview)
+
 # Slider Horizontal alpha
 alpha_slider = Slider(
     ax=plt.axes([0.1, 0.25, 0.8, 0.03], facecolor="lightgoldenrodyellow"),
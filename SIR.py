@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 from scipy.integrate import odeint
 from matplotlib.widgets import Slider, Button
 
+from cache import memoize
+
 # Configuration de l'affichage de matplotlib
 # matplotlib.use('Qt5Agg') # A utiliser sur Linux
 matplotlib.use('TkAgg') # A utiliser sur Windows
@@ -30,11 +32,17 @@ t = np.linspace(0, 160, 160)
 # Initial conditions vector
 y0 = S0, I0, R0
 
+
+# Résolution mise en cache : revenir sur une valeur déjà vue des sliders ne recalcule rien
+@memoize()
+def solve(beta, gamma):
+    return odeint(deriv, y0, t, args=(N, beta, gamma)).T
+
+
 # Create the figure and the line that we will manipulate
 fig, ax = plt.subplots()
 
-ret = odeint(deriv, y0, t, args=(N, init_beta, init_gamma))
-S, I, R = ret.T
+S, I, R = solve(init_beta, init_gamma)
 
 line1, = plt.plot(S, label="Susceptible")
 line2, = plt.plot(I, label="Infected")
@@ -70,8 +78,7 @@ gamma_slider = Slider(
 
 # The function to be called anytime a slider's value changes
 def update(val):
-    ret = odeint(deriv, y0, t, args=(N, beta_slider.val, gamma_slider.val))
-    S, I, R = ret.T
+    S, I, R = solve(beta_slider.val, gamma_slider.val)
     line1.set_ydata(S)
     line2.set_ydata(I)
     line3.set_ydata(R)
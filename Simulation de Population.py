@@ -1,6 +1,4 @@
-import random
 import time
-from math import sqrt
 import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
@@ -8,6 +6,11 @@ from matplotlib.animation import FuncAnimation
 from moviepy.editor import VideoClip
 from moviepy.video.io.bindings import mplfig_to_npimage
 
+import ensemble
+from arena import Arena
+from history import History, load
+from population import Population
+
 # Configuration de l'affichage de matplotlib
 # matplotlib.use('Qt5Agg')  # A utiliser sur Linux
 matplotlib.use('TkAgg')  # A utiliser sur Windows
@@ -28,112 +31,38 @@ THR = 2  # Contamination area
 INCUBATION_TIME = 30
 GAMMA = 0.03
 
-list_of_ppl = []
-history = []
+COLORS = ("blue", "yellow", "red", "grey")  # Couleurs des états S, E, I, R
+BLIT = True  # Ne redessine que les points à chaque image de l'animation
 
-fig, ax = plt.subplots()
-ax.set_autoscale_on(False)
+SETTINGS = dict(s0=S0, e0=E0, i0=I0, r0=R0, x_len=X_LEN, y_len=Y_LEN, thr=THR,
+                incubation_time=INCUBATION_TIME, gamma=GAMMA)
 
+# Mode ensemble : nombre de réalisations et graine maîtresse
+ENSEMBLE_SIZE = 100
+ENSEMBLE_SEED = 0
 
+HISTORY_FILE = "history.npy"  # Effectifs (jour, S, E, I, R) à chaque étape
 
-def gen_ppl():
-    lst = []
-    for _ in range(S0):
-        lst.append({"x": random.random() * X_LEN, "y": random.random() * Y_LEN,
-                    "x_vect": random.random() - 0.5, "y_vect": random.random() - 0.5,
-                    "S": True, "E": False, "I": False, "R": False, "incubation": INCUBATION_TIME})
-
-    for _ in range(E0):
-        lst.append({"x": random.random() * X_LEN, "y": random.random() * Y_LEN,
-                    "x_vect": random.random() - 0.5, "y_vect": random.random() - 0.5,
-                    "S": False, "E": True, "I": False, "R": False, "incubation": INCUBATION_TIME})
-
-    for _ in range(I0):
-        lst.append({"x": random.random() * X_LEN, "y": random.random() * Y_LEN,
-                    "x_vect": random.random() - 0.5, "y_vect": random.random() - 0.5,
-                    "S": False, "E": False, "I": True, "R": False, "incubation": INCUBATION_TIME})
-
-    for _ in range(R0):
-        lst.append({"x": random.random() * X_LEN, "y": random.random() * Y_LEN,
-                    "x_vect": random.random() - 0.5, "y_vect": random.random() - 0.5,
-                    "S": False, "E": False, "I": False, "R": True, "incubation": INCUBATION_TIME})
-
-    return lst
-
-
-def contaminate(lst):
-    for ppl in lst:
-        if ppl["I"]:
-            for ppl2 in lst:
-                if ppl2["S"] and sqrt( (ppl["x"]-ppl2["x"])**2 + (ppl["y"]-ppl2["y"])**2 ) <= THR:
-                    ppl2["E"] = True
-                    ppl2["S"] = False
-    return lst
-
-
-def incubate(lst):
-    for ppl in lst:
-        if ppl["E"]:
-            ppl["incubation"] -= 1
-            if ppl["incubation"] == 0:
-                ppl["E"] = False
-                ppl["I"] = True
-    return lst
-
-
-def get_rekt(lst):
-    for ppl in lst:
-        if ppl["I"]:
-            if random.random() < GAMMA:
-                ppl["I"] = False
-                ppl["R"] = True
-                ppl["x_vect"] = 0
-                ppl["y_vect"] = 0
-    return lst
-
-
-def render(lst):
-    ax.cla()
-    ax.plot([0, X_LEN], [0,0], linewidth=1, color='black')
-    ax.plot([X_LEN, X_LEN], [0, Y_LEN], linewidth=1, color='black')
-    ax.plot([X_LEN, 0], [Y_LEN, Y_LEN], linewidth=1, color='black')
-    ax.plot([0, 0], [Y_LEN, 0], linewidth=1, color='black')
-    for ppl in lst:
-        if ppl["S"]:
-            ax.scatter(ppl["x"], ppl["y"], color="blue")
-        elif ppl["E"]:
-            ax.scatter(ppl["x"], ppl["y"], color="yellow")
-        elif ppl["I"]:
-            ax.scatter(ppl["x"], ppl["y"], color="red")
-        elif ppl["R"]:
-            ax.scatter(ppl["x"], ppl["y"], color="grey")
-        else:
-            ax.scatter(ppl["x"], ppl["y"], color="black")
+population = None
+history = None
 
+fig, ax = plt.subplots()
+arena = Arena(ax, X_LEN, Y_LEN, COLORS)
 
-def update(x):
-    global history
-    global list_of_ppl
 
-    history.append([x,
-                    len([x for x in list_of_ppl if x["S"]]),
-                    len([x for x in list_of_ppl if x["E"]]),
-                    len([x for x in list_of_ppl if x["I"]]),
-                    len([x for x in list_of_ppl if x["R"]])])
+def gen_ppl():
+    return Population(**SETTINGS)
+
 
-    for ppl in list_of_ppl:
-        ppl["x"] += ppl["x_vect"]
-        ppl["y"] += ppl["y_vect"]
-        if ppl["x"] < 0 or ppl["x"] > X_LEN:
-            ppl["x_vect"] = -ppl["x_vect"]
-        if ppl["y"] < 0 or ppl["y"] > Y_LEN:
-            ppl["y_vect"] = -ppl["y_vect"]
+def render(pop):
+    return arena.draw(pop)
 
-    list_of_ppl = contaminate(list_of_ppl)
-    list_of_ppl = incubate(list_of_ppl)
-    list_of_ppl = get_rekt(list_of_ppl)
 
-    render(list_of_ppl)
+def update(x):
+    if history is not None:
+        history.append((x, *population.counts()))
+    population.tick()
+    return render(population)
 
 
 def make_frame(x):
@@ -148,38 +77,55 @@ def bouboules_without_render(duration, fps):
         update(i)
 
 
+def plot_ensemble(result, fps):
+    """
+    Moyenne et bande de quantiles des effectifs de chaque état sur l'ensemble des réalisations.
+    """
+    days = np.arange(result.counts.shape[1]) / fps
+    low, high = min(result.quantiles), max(result.quantiles)
+    for state, color in enumerate(COLORS):
+        plt.plot(days, result.mean[:, state], color=color, label="SEIR"[state])
+        plt.fill_between(days, result.quantiles[low][:, state], result.quantiles[high][:, state], color=color, alpha=0.2)
+    plt.legend()
+    plt.show()
+
+
 def main(ren):
-    global list_of_ppl
-    list_of_ppl = gen_ppl()
-    render(list_of_ppl)
+    global population, history
+    population = gen_ppl()
+    render(population)
     if ren == 0:
         t = time.perf_counter()
-        ani = FuncAnimation(fig, update, interval=10)
+        ani = FuncAnimation(fig, update, interval=10, blit=BLIT, cache_frame_data=False)
         print(f"The simulation + render took {time.perf_counter()-t} s.")
         plt.show()
     elif ren == 1:
         animation = VideoClip(make_frame, duration=40)
         animation.write_gif("output.gif", fps=20)
     elif ren == 2:
+        # Seul mode enregistré dans HISTORY_FILE (et tracé ensuite) : les autres ne l'écrasent pas
+        with History(HISTORY_FILE) as history:
+            t = time.perf_counter()
+            bouboules_without_render(40,20)
+            print(f"The simulation took {time.perf_counter() - t} s.")
+        history = None
+    elif ren == 3:
         t = time.perf_counter()
-        bouboules_without_render(40,20)
-        print(f"The simulation took {time.perf_counter() - t} s.")
+        result = ensemble.run(ENSEMBLE_SIZE, 40*20, SETTINGS, ENSEMBLE_SEED)
+        print(f"The {ENSEMBLE_SIZE} simulations took {time.perf_counter() - t} s.")
+        plot_ensemble(result, 20)
 
 
 if __name__ == "__main__":
     main(2)
 
-    days = [x[0] for x in history]
-    S = [x[1] for x in history]
-    E = [x[2] for x in history]
-    I = [x[3] for x in history]
-    R = [x[4] for x in history]
+    days, S, E, I, R = load(HISTORY_FILE).T
 
     plt.subplot(2, 1, 1)
     plt.bar(days, R, color='grey', label='R')
     plt.bar(days, I, color='red', bottom=R, label='I')
-    plt.bar(days, E, color='yellow', bottom=[I[i]+R[i] for i in range(len(I))], label='E')
-    plt.bar(days, S, color='blue', bottom=[E[i]+I[i]+R[i] for i in range(len(I))], label='S')
+    plt.bar(days, E, color='yellow', bottom=I+R, label='E')
+    plt.bar(days, S, color='blue', bottom=E+I+R, label='S')
 
     plt.legend()
     plt.show()
@@ -6,9 +6,15 @@ from matplotlib.animation import FuncAnimation
 from moviepy.editor import VideoClip
 from moviepy.video.io.bindings import mplfig_to_npimage
 
+from cache import memoize
+from frames import FrameSource
+from integrators import integrate
+from models import SEIR
+
 # Configuration de l'affichage de matplotlib
 # matplotlib.use('Qt5Agg') # A utiliser sur Linux
-matplotlib.use('TkAgg')  # A utiliser sur Windows
+# Processus d'export du gif (frames.py, __mp_main__) : images calculées en Agg, sans fenêtre
+matplotlib.use('Agg' if __name__ == "__mp_main__" else 'TkAgg')  # A utiliser sur Windows
 
 # Contact rate, beta, and mean recovery rate, gamma, (in 1/days).
 INIT_ALPHA = 0.75  # Taux d'incubation (0-1)
@@ -24,28 +30,18 @@ I0 = 5  # Nombre initial de personnes infectées infectieuses
 R0 = 0  # Nombre initial de personnes retirées
 S0 = N0 - (I0 + R0 + E0)  # Nombre initial de personnes Saines
 
+# Processus utilisés pour l'export du gif (None : un par coeur, 1 : export en série)
+EXPORT_PROCESSES = None
+
 # Precision et durée de la simulation
 SIM_PRECISION = 1000
 SIM_MULTIPLIER = 2
+SIM_METHOD = "euler"  # euler, heun, midpoint, rk4 ou à pas adaptatif : heun_euler, bogacki_shampine
 
 
+@memoize(config=lambda: (SIM_PRECISION, SIM_MULTIPLIER, SIM_METHOD))
 def solve(S0, E0, I0, R0, alpha, beta, gamma, micro, nu):
-    S, E, I, R = [S0], [E0], [I0], [R0]
-    h = 1 / SIM_PRECISION
-    for o in range(SIM_PRECISION * SIM_MULTIPLIER):
-        St, Et, It, Rt = S[o - 1], E[o - 1], I[o - 1], R[o - 1]
-
-        # Equations
-        dSdt = -beta * St * It + nu * (St + Et + It + Rt) - micro * St
-        dEdt = beta * St * It - alpha * Et - micro * Et
-        dIdt = alpha * Et - gamma * It - micro * It
-        dRdt = gamma * It - micro * Rt
-
-        S.append(St + h * dSdt)
-        E.append(Et + h * dEdt)
-        I.append(It + h * dIdt)
-        R.append(Rt + h * dRdt)
-    return S, E, I, R
+    return integrate(SEIR, (S0, E0, I0, R0), (alpha, beta, gamma, micro, nu), 1 / SIM_PRECISION, SIM_PRECISION * SIM_MULTIPLIER, SIM_METHOD).T
 
 
 def init():
@@ -162,5 +158,14 @@ nu_slider = Slider(
 
 # ani = FuncAnimation(fig, update, frames=[x/100 for x in range(0, 100)], init_func=init, blit=True)
 
-animation = VideoClip(make_frame, duration=5)
-animation.write_gif("output.gif", fps=20)
+if __name__ == "__main__":
+    if EXPORT_PROCESSES == 1:
+        animation = VideoClip(make_frame, duration=5)
+        animation.write_gif("output.gif", fps=20)
+    else:
+        # Chaque processus (lancé par spawn) réimporte ce script, recrée la figure en Agg
+        # et calcule ses images, assemblées ici dans l'ordre
+        frames = FrameSource(make_frame, 5, 20, EXPORT_PROCESSES)
+        animation = VideoClip(frames, duration=5)
+        animation.write_gif("output.gif", fps=20)
+        frames.close()
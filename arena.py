@@ -0,0 +1,57 @@
+import numpy as np
+from matplotlib.colors import to_rgba_array
+
+# Au-delà de ce nombre de personnes, le nuage de points est remplacé par une image
+RASTER_THRESHOLD = 3000
+RASTER_SIZE = 500  # Pixels par côté de l'image
+# Ordre de dessin des états dans l'image (le dernier est au-dessus) : R, S, E puis I
+RASTER_ORDER = (3, 0, 1, 2)
+
+
+class Arena:
+    """
+    Affichage du tableau de jeu de la simulation de population.
+
+    Les bords et le nuage de points (un seul PathCollection) sont créés une fois ;
+    à chaque image, seules les positions (set_offsets) et les couleurs par état sont mises à jour.
+    Au-delà de RASTER_THRESHOLD personnes, les points sont rastérisés dans une image de taille fixe,
+    ce qui rend le coût d'affichage indépendant du nombre de personnes.
+    draw() retourne les artistes modifiés, pour FuncAnimation(..., blit=True) qui les marque animés.
+    """
+
+    def __init__(self, ax, x_len, y_len, colors):
+        self.x_len, self.y_len = x_len, y_len
+        self.palette = to_rgba_array(colors)
+        ax.set_autoscale_on(False)
+        ax.set_xlim(-1, x_len + 1)
+        ax.set_ylim(-1, y_len + 1)
+        ax.plot([0, x_len, x_len, 0, 0], [0, 0, y_len, y_len, 0], linewidth=1, color='black')
+
+        self.points = ax.scatter(np.empty(0), np.empty(0))
+        # Couleur 0 : fond des axes, couleur k + 1 : état k
+        self.raster_palette = np.vstack((to_rgba_array(ax.get_facecolor()), self.palette))
+        self.pixels = np.zeros(RASTER_SIZE * RASTER_SIZE, dtype=np.uint8)
+        self.image = ax.imshow(self.raster_palette[self.pixels.reshape(RASTER_SIZE, RASTER_SIZE)],
+                               extent=(0, x_len, 0, y_len), origin="lower", interpolation="nearest",
+                               aspect="auto", visible=False)
+
+    def draw(self, pop):
+        if len(pop) > RASTER_THRESHOLD:
+            self.points.set_visible(False)
+            self.image.set_visible(True)
+            return self.rasterize(pop),
+        self.image.set_visible(False)
+        self.points.set_visible(True)
+        self.points.set_offsets(np.column_stack((pop.x, pop.y)))
+        self.points.set_facecolor(self.palette[pop.state])
+        return self.points,
+
+    def rasterize(self, pop):
+        col = np.clip((pop.x * (RASTER_SIZE / self.x_len)).astype(np.intp), 0, RASTER_SIZE - 1)
+        row = np.clip((pop.y * (RASTER_SIZE / self.y_len)).astype(np.intp), 0, RASTER_SIZE - 1)
+        index = row * RASTER_SIZE + col
+        self.pixels.fill(0)
+        for state in RASTER_ORDER:
+            self.pixels[index[pop.state == state]] = state + 1
+        self.image.set_data(self.raster_palette[self.pixels.reshape(RASTER_SIZE, RASTER_SIZE)])
+        return self.image
@@ -0,0 +1,71 @@
+import threading
+import traceback
+
+SETTLE = 0.25  # Secondes sans nouvelle demande avant de lancer la résolution complète
+POLL_INTERVAL = 30  # Millisecondes entre deux vérifications des résultats par l'interface
+
+
+class BackgroundSolver:
+    """
+    Résolution en arrière-plan pour les callbacks des sliders.
+
+    submit() ne fait qu'enregistrer la dernière demande : un thread calcule d'abord un aperçu
+    (preview, peu coûteux), puis la solution complète (solve) si aucune autre demande n'arrive
+    pendant settle secondes. Les demandes dépassées pendant un glissement sont abandonnées,
+    et un résultat arrivé après une demande plus récente n'est jamais affiché.
+    Une résolution qui échoue est signalée sur la sortie d'erreur et le thread continue.
+    draw(courbes) est appelé dans le thread de l'interface, par un timer de la figure.
+    """
+
+    def __init__(self, fig, solve, draw, preview=None, settle=SETTLE, interval=POLL_INTERVAL):
+        self.solve = solve
+        self.draw = draw
+        self.preview = preview
+        self.settle = settle
+
+        self.condition = threading.Condition()
+        self.request = None  # Derniers arguments demandés, pas encore pris par le thread
+        self.generation = 0  # Numéro de la dernière demande
+        self.result = None  # Courbes à afficher
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.timer = fig.canvas.new_timer(interval=interval)
+        self.timer.add_callback(self.poll)
+        self.timer.start()
+
+    def submit(self, *args):
+        with self.condition:
+            self.request = args
+            self.generation += 1
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.request is not None)
+                args, generation = self.request, self.generation
+                self.request = None
+
+            try:
+                if self.preview is not None:
+                    self.publish(generation, self.preview(*args))
+                    # Une nouvelle demande pendant l'attente annule la résolution complète
+                    with self.condition:
+                        if self.condition.wait_for(lambda: self.request is not None, timeout=self.settle):
+                            continue
+                self.publish(generation, self.solve(*args))
+            except Exception:
+                # Paramètres où la résolution échoue : le thread doit servir les demandes suivantes
+                traceback.print_exc()
+
+    def publish(self, generation, curves):
+        with self.condition:
+            if generation == self.generation:
+                self.result = curves
+
+    def poll(self):
+        with self.condition:
+            result, self.result = self.result, None
+        if result is not None:
+            self.draw(result)
@@ -0,0 +1,179 @@
+"""
+Lancement sans affichage d'une bibliothèque de scénarios décrits en JSON ou YAML.
+
+Exemple de fichier (JSON, une liste ou {"scenarios": [...]}) :
+
+    [
+        {"name": "seir", "model": "SEIR", "horizon": 2,
+         "y0": {"S": 995, "E": 0, "I": 5, "R": 0},
+         "params": {"alpha": 0.75, "beta": 0.8, "gamma": 0.05, "micro": 0.01, "nu": 0.009},
+         "solver": {"method": "rk4", "h": 0.001}},
+        {"name": "bouboules", "model": "agent", "ticks": 800, "replicates": 10, "seed": 0,
+         "settings": {"s0": 290, "e0": 0, "i0": 10, "r0": 0}}
+    ]
+
+Méthodes du solveur : celles d'integrators.py (euler, heun, midpoint, rk4, heun_euler, bogacki_shampine)
+ou celles de scipy.integrate.solve_ivp (RK45, DOP853, LSODA, Radau, BDF).
+Avec "events": true, le pic, l'extinction et l'immunité collective sont localisés entre les pas (events.py) ;
+"stop": true arrête alors la résolution à l'extinction de l'épidémie.
+Chaque scénario donne un fichier name.npz compressé ; summary.csv résume tous les scénarios.
+Avec --cache, les trajectoires sont gardées sur disque (store.py) : un scénario identique, relancé plus tard
+ou par quelqu'un d'autre sur le même dossier, n'est pas résolu une seconde fois.
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+import ensemble
+from events import Detector, for_solve_ivp, from_solve_ivp, integrate_events, milestones, summary
+from integrators import RTOL, ATOL, EMBEDDED, TABLEAUX, integrate, integrate_adaptive
+from models import MODELS
+from store import ROOT, Store, key
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+SOLVER = {"method": "euler", "h": 1e-3, "rtol": RTOL, "atol": ATOL, "events": False, "stop": False}
+
+
+def load(path):
+    """
+    Liste des scénarios d'un fichier .json, .yaml ou .yml.
+    """
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ImportError("PyYAML est nécessaire pour lire les scénarios YAML (pip install pyyaml)")
+            scenarios = yaml.safe_load(f)
+        else:
+            scenarios = json.load(f)
+    if isinstance(scenarios, dict):
+        scenarios = scenarios["scenarios"]
+    return scenarios
+
+
+def solve_compartments(scenario, store=None):
+    """
+    Résout un scénario de modèle à compartiments. Retourne (t, y, étapes clés) avec y de forme
+    (points, compartiments) ; les étapes clés sont vides sans l'option "events" du solveur.
+    Avec store (store.Store), un calcul déjà fait est relu depuis le cache, projeté en mémoire.
+    """
+    model = MODELS[scenario["model"]]
+    y0 = [scenario["y0"][c] for c in model.compartments]
+    params = [scenario["params"][p] for p in model.parameters]
+    solver = {**SOLVER, **scenario.get("solver", {})}
+    h, steps = solver["h"], round(scenario["horizon"] / solver["h"])
+    t = h * np.arange(steps + 1)
+
+    def compute():
+        if not solver["events"]:
+            if solver["method"] in TABLEAUX:
+                y = integrate(model, y0, params, h, steps, solver["method"], solver["rtol"], solver["atol"])
+            else:
+                y = solve_ivp(lambda _t, y: model.rhs(y, params), (0, t[-1]), y0, method=solver["method"],
+                              t_eval=t, rtol=solver["rtol"], atol=solver["atol"]).y.T
+            return y, {}
+
+        events = milestones(model, params, terminal=solver["stop"])
+        if solver["method"] in EMBEDDED:
+            detector = Detector(model, params, events)
+            y = integrate_adaptive(model, y0, params, t, solver["method"], solver["rtol"], solver["atol"],
+                                   detector=detector)[0]
+            found = detector.found
+        elif solver["method"] in TABLEAUX:
+            y, detector = integrate_events(model, y0, params, h, steps, events, solver["method"])
+            found = detector.found
+        else:
+            solution = solve_ivp(lambda _t, y: model.rhs(y, params), (0, t[-1]), y0, method=solver["method"],
+                                 t_eval=t, rtol=solver["rtol"], atol=solver["atol"],
+                                 events=for_solve_ivp(model, params, events))
+            y, found = solution.y.T, from_solve_ivp(solution, events)
+        return y, summary(model, found)
+
+    y, found = compute() if store is None else store.fetch(key(model, y0, params, t, solver), compute)
+    return t[:len(y)], y, found
+
+
+def summarize(names, t, y):
+    """
+    Pic des infectés, instant du pic et état final.
+    """
+    i = y[:, names.index("I")]
+    peak = int(np.argmax(i))
+    row = {"peak_I": i[peak], "t_peak": t[peak]}
+    row.update({f"final_{c}": y[-1, k] for k, c in enumerate(names)})
+    return row
+
+
+def run(scenario, out, store=None):
+    """
+    Lance un scénario et écrit ses résultats dans out/name.npz. Retourne sa ligne du résumé.
+    """
+    start = time.perf_counter()
+    path = os.path.join(out, scenario["name"] + ".npz")
+    if scenario["model"] == "agent":
+        seeds = np.random.SeedSequence(scenario.get("seed", 0)).spawn(scenario.get("replicates", 1))
+        counts = np.stack([ensemble.replicate(s, scenario["ticks"], scenario["settings"]) for s in seeds])
+        np.savez_compressed(path, counts=counts)
+        row = summarize(list("SEIR"), np.arange(scenario["ticks"]), counts.mean(axis=0))
+    else:
+        t, y, found = solve_compartments(scenario, store)
+        np.savez_compressed(path, t=t, y=y, compartments=MODELS[scenario["model"]].compartments)
+        row = summarize(list(MODELS[scenario["model"]].compartments), t, y)
+        # Les instants localisés entre les pas remplacent ceux de la grille
+        row.update({name: value for name, value in found.items() if value is not None})
+    return {"name": scenario["name"], "model": scenario["model"], "seconds": time.perf_counter() - start, **row}
+
+
+def run_scenario(scenario, out, store=None):
+    """
+    Comme run, mais un scénario en échec donne une ligne d'erreur (name, model, error) au lieu de lever :
+    les autres scénarios du pool et le résumé ne sont pas perdus.
+    """
+    try:
+        return run(scenario, out, store)
+    except Exception as error:
+        return {"name": scenario.get("name"), "model": scenario.get("model"), "error": f"{type(error).__name__}: {error}"}
+
+
+def run_all(scenarios, out, processes=None, cache=None):
+    """
+    Lance tous les scénarios dans un pool de processus et écrit out/summary.csv (colonne error
+    pour les scénarios en échec).
+    Avec cache (dossier), les modèles à compartiments déjà résolus sont relus depuis le cache de store.py.
+    """
+    os.makedirs(out, exist_ok=True)
+    store = Store(cache) if cache else None
+    with ProcessPoolExecutor(processes) as pool:
+        rows = list(pool.map(run_scenario, scenarios, [out] * len(scenarios), [store] * len(scenarios)))
+
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    with open(os.path.join(out, "summary.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lance des scénarios sans affichage.")
+    parser.add_argument("scenarios", help="Fichier .json, .yaml ou .yml")
+    parser.add_argument("--out", default="results", help="Dossier des résultats")
+    parser.add_argument("--processes", type=int, default=None, help="Par défaut : un par coeur")
+    parser.add_argument("--cache", nargs="?", const=ROOT, default=None,
+                        help=f"Cache des résultats partagé entre les lancements (par défaut {ROOT})")
+    args = parser.parse_args()
+
+    for row in run_all(load(args.scenarios), args.out, args.processes, args.cache):
+        if "error" in row:
+            print(f"{row['name']}: échec ({row['error']})")
+            continue
+        print(f"{row['name']}: {row['seconds']:.2f} s, pic de {row['peak_I']:.1f} infectés à t = {row['t_peak']:.2f}")
@@ -0,0 +1,190 @@
+"""
+Mesure des performances des solveurs et de la simulation de population.
+
+Pour chaque cas : meilleur temps sur plusieurs répétitions, débit, pic mémoire (tracemalloc)
+et, pour les solveurs, erreur maximale contre une solution de référence (DOP853, rtol=1e-12).
+Chaque cas est appelé une première fois hors mesure (compilation numba, caches, imports).
+Les résultats sont ajoutés à un historique JSON ; un cas plus lent que la dernière mesure de même mode
+(--quick ou complet) et de même backend (numba ou numpy) de plus de THRESHOLD est signalé comme
+régression (code de sortie 1).
+
+    python benchmark.py [--history benchmarks.json] [--threshold 0.2] [--quick]
+"""
+import argparse
+import json
+import os
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+from scipy.integrate import odeint, solve_ivp
+
+import kernels
+from integrators import integrate
+from models import SEIR, SEIRV, SEIGVM
+from population import Population
+
+HISTORY = "benchmarks.json"
+THRESHOLD = 0.2  # Ralentissement relatif signalé comme régression
+REPEAT = 3
+
+SIZES = (300, 3000, 30000)  # Tailles de population de la simulation
+TICKS = 20
+
+
+def measure(function, work, repeat=REPEAT, reference=None):
+    """
+    Meilleur temps de function() sur repeat essais après un appel d'échauffement, débit (work unités
+    par seconde), pic mémoire d'un appel et erreur maximale contre reference si elle est donnée.
+    """
+    function()
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        seconds.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    row = {"seconds": min(seconds), "throughput": work / min(seconds), "peak_memory": peak}
+    if reference is not None:
+        row["error"] = float(np.abs(np.asarray(result) - reference).max())
+    return row
+
+
+def reference(model, y0, params, t):
+    return solve_ivp(lambda _t, y: model.rhs(y, params), (t[0], t[-1]), y0, method="DOP853", t_eval=t,
+                     rtol=1e-12, atol=1e-10).y.T
+
+
+def solvers(repeat):
+    results = {}
+
+    # SIR.py : odeint, beta normalisé par la population
+    n, beta, gamma = 1000, 0.5, 0.1
+    t = np.linspace(0, 160, 160)
+
+    def deriv(y, _t):
+        s, i, r = y
+        return -beta * s * i / n, beta * s * i / n - gamma * i, gamma * i
+
+    exact = solve_ivp(lambda _t, y: deriv(y, _t), (0, 160), (999, 1, 0), method="DOP853", t_eval=t,
+                      rtol=1e-12, atol=1e-10).y.T
+    results["SIR odeint"] = measure(lambda: odeint(deriv, (999, 1, 0), t), len(t), repeat, exact)
+
+    # SEIR (solve_ivp).py : DOP853 avec sortie dense
+    y0, params = (995, 0, 5, 0), (0.75, 0.02, 0.45, 0.2, 0.25)
+    t = np.linspace(0, 100, 100 * 20)
+    results["SEIR solve_ivp DOP853"] = measure(
+        lambda: solve_ivp(lambda _t, y: SEIR.rhs(y, params), (0, 100), y0, method="DOP853", t_eval=t,
+                          dense_output=True).y.T, len(t), repeat, reference(SEIR, y0, params, t))
+    results["SEIR solve_ivp LSODA jac"] = measure(
+        lambda: solve_ivp(lambda _t, y: SEIR.rhs(y, params), (0, 100), y0, method="LSODA", t_eval=t,
+                          vectorized=True, jac=lambda _t, y: SEIR.jacobian(y, params), rtol=1e-6, atol=1e-6).y.T,
+        len(t), repeat, reference(SEIR, y0, params, t))
+
+    # solve() des scripts : euler explicite avec leur précision
+    cases = (
+        (SEIR, (995, 0, 5, 0), (0.75, 0.8, 0.05, 0.01, 0.009), 1000, 2),
+        (SEIRV, (995, 0, 5, 0, 0), (0.75, 0.8, 0.05, 0.01, 0.009, 0.5), 1000, 2),
+        (SEIGVM, (995, 0, 5, 0, 0, 0), (0.75, 0.8, 0.05, 0.01, 0.009, 0.5, 0.2), 250, 50),
+    )
+    for model, y0, params, precision, multiplier in cases:
+        steps = precision * multiplier
+        t = np.arange(steps + 1) / precision
+        results[f"{model.name} solve() euler"] = measure(
+            lambda: integrate(model, y0, params, 1 / precision, steps), steps, repeat,
+            reference(model, y0, params, t))
+    return results
+
+
+def agents(repeat, sizes=SIZES, ticks=TICKS):
+    """
+    Temps de chaque étape de la simulation de population, à densité constante (celle de 300 personnes
+    sur 100 x 100). Débit en personnes x ticks par seconde.
+    """
+    results = {}
+    for n in sizes:
+        side = 100 * np.sqrt(n / 300)
+        for phase in ("move", "contaminate", "incubate", "get_rekt"):
+            def run():
+                pop = Population(n - n // 30, 0, n // 30, 0, x_len=side, y_len=side, seed=0)
+                elapsed = 0.
+                for _ in range(ticks):
+                    start = time.perf_counter()
+                    getattr(pop, phase)()
+                    elapsed += time.perf_counter() - start
+                    pop.tick()
+                return elapsed
+
+            run()  # Echauffement
+            seconds = min(run() for _ in range(repeat))
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[f"agents {phase} N={n}"] = {"seconds": seconds, "throughput": n * ticks / seconds,
+                                                 "peak_memory": peak}
+    return results
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def latest(history, mode, backend):
+    """
+    Résultats de la dernière mesure de l'historique faite dans ce mode et avec ce backend, ou None.
+    """
+    for entry in reversed(history):
+        if entry.get("mode") == mode and entry.get("backend") == backend:
+            return entry["results"]
+    return None
+
+
+def regressions(results, previous, threshold=THRESHOLD):
+    """
+    Cas dont le temps dépasse celui de la mesure précédente de plus de threshold (en relatif).
+    """
+    return {name: row["seconds"] / previous[name]["seconds"] for name, row in results.items()
+            if name in previous and row["seconds"] > (1 + threshold) * previous[name]["seconds"]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure des performances et suivi des régressions.")
+    parser.add_argument("--history", default=HISTORY)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--quick", action="store_true", help="Une seule répétition, petites populations")
+    args = parser.parse_args()
+
+    mode = "quick" if args.quick else "full"
+    backend = "numba" if kernels.JIT else "numpy"
+    repeat = 1 if args.quick else REPEAT
+    results = {**solvers(repeat), **agents(repeat, SIZES[:2] if args.quick else SIZES)}
+
+    history = []
+    if os.path.exists(args.history):
+        with open(args.history) as f:
+            history = json.load(f)
+    previous = latest(history, mode, backend)
+    slower = regressions(results, previous, args.threshold) if previous else {}
+
+    for name, row in results.items():
+        flag = f"  REGRESSION x{slower[name]:.2f}" if name in slower else ""
+        error = f"  erreur {row['error']:.2e}" if "error" in row else ""
+        print(f"{name:32s} {row['seconds'] * 1e3:10.2f} ms  {row['throughput']:12.0f} /s"
+              f"  {row['peak_memory'] / 2**20:8.2f} Mio{error}{flag}")
+
+    history.append({"date": time.strftime("%Y-%m-%d %H:%M:%S"), "commit": commit(),
+                    "mode": mode, "backend": backend, "results": results})
+    with open(args.history, "w") as f:
+        json.dump(history, f, indent=1)
+    if slower:
+        raise SystemExit(1)
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from functools import update_wrapper
+
+import numpy as np
+
+CACHE_SIZE = 256  # Nombre maximal de résultats gardés
+QUANTUM = 1e-6  # Pas de quantification des paramètres numériques
+
+
+def is_real(value):
+    return isinstance(value, (float, np.floating))
+
+
+def quantize(value, quantum=QUANTUM):
+    """
+    Clé hachable d'un argument : les réels sont arrondis au multiple de quantum le plus proche,
+    les séquences et tableaux sont convertis élément par élément.
+    """
+    if is_real(value):
+        return round(value / quantum)
+    if isinstance(value, (tuple, list, np.ndarray)):
+        return tuple(quantize(v, quantum) for v in value)
+    return value
+
+
+def dequantize(value, quantum=QUANTUM):
+    """
+    Valeurs réellement utilisées pour le calcul, identiques pour tous les arguments de même clé.
+    """
+    if is_real(value):
+        return round(value / quantum) / (1 / quantum)
+    if isinstance(value, np.ndarray):
+        return np.array([dequantize(v, quantum) for v in value])
+    if isinstance(value, (tuple, list)):
+        return type(value)(dequantize(v, quantum) for v in value)
+    return value
+
+
+def freeze(result):
+    """
+    Rend les tableaux d'un résultat en lecture seule : ils sont partagés entre les appels.
+    """
+    if isinstance(result, np.ndarray):
+        result.flags.writeable = False
+    elif isinstance(result, tuple):
+        for r in result:
+            freeze(r)
+    return result
+
+
+class Memoized:
+    """
+    Cache LRU devant une fonction de résolution.
+
+    La clé est formée des arguments quantifiés et de la configuration du solveur (config(),
+    par exemple précision et méthode). Le calcul est fait avec les arguments quantifiés,
+    si bien qu'une même clé donne toujours le même résultat.
+    stats() donne le nombre de succès et d'échecs du cache.
+    """
+
+    def __init__(self, function, maxsize=CACHE_SIZE, quantum=QUANTUM, config=None):
+        update_wrapper(self, function)
+        self.function = function
+        self.maxsize = maxsize
+        self.quantum = quantum
+        self.config = config
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+
+    def __call__(self, *args):
+        key = (quantize(args, self.quantum), self.config() if self.config else None)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        result = freeze(self.function(*dequantize(args, self.quantum)))
+        self.entries[key] = result
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return result
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "maxsize": self.maxsize}
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+
+def memoize(maxsize=CACHE_SIZE, quantum=QUANTUM, config=None):
+    """
+    Décorateur : @memoize(config=lambda: (SIM_PRECISION, SIM_METHOD)) def solve(...): ...
+    """
+    def decorator(function):
+        return Memoized(function, maxsize, quantum, config)
+    return decorator
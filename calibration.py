@@ -0,0 +1,260 @@
+"""
+Ajustement des paramètres d'un modèle (SEIR, SEIRV...) à des nouveaux cas déclarés.
+
+Les cas déclarés sur (t[k-1], t[k]] sont comparés aux passages vers I du modèle sur le même intervalle,
+comptés par un compartiment supplémentaire C (counting). La perte est la log-vraisemblance de Poisson
+(« poisson ») ou les moindres carrés (« squares »).
+
+Le gradient vient des équations de sensibilité, résolues avec le modèle : pour s = dy/dparams,
+
+    ds/dt = jacobian(y) @ s + parameter_jacobian(y)
+
+Une résolution donne la perte et son gradient exacts, sans différences finies. L-BFGS-B part de
+plusieurs points tirés au hasard (en parallèle dans un pool de processus) ; quand de nouvelles données
+arrivent, refit repart de l'ajustement précédent.
+
+    python calibration.py cas.csv --model SEIR --y0 995 0 5 0
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.integrate import solve_ivp
+from scipy.optimize import OptimizeResult, minimize
+
+from engine import Model, Transition
+from models import MODELS, RANGES
+
+FIT = ("alpha", "beta", "gamma", "micro", "nu")  # Paramètres ajustés par défaut (les autres sont fixés)
+LOSSES = ("poisson", "squares")
+STARTS = 8  # Points de départ de l'ajustement initial
+REACH = 10  # Chaque paramètre ajusté reste entre params / REACH et params * REACH (et dans RANGES)
+FTOL = 1e-8  # Arrêt de L-BFGS-B quand la perte ne baisse plus que de cette fraction
+MAX_ITERATIONS = 200
+MAX_EVALUATIONS = 20000  # Au-delà, une résolution est abandonnée (paramètres où le système devient très raide)
+PENALTY = 1e3  # Pente de la pénalité qui remplace une résolution abandonnée
+METHOD = "LSODA"
+RTOL = 1e-8
+ATOL = 1e-8
+COUNTER = "C"
+
+
+def counting(model, target="I"):
+    """
+    Le modèle complété d'un compartiment COUNTER qui cumule les passages vers target
+    (hors naissances) : C(t[k]) - C(t[k-1]) est le nombre de nouveaux cas sur l'intervalle.
+    """
+    counters = [Transition(None, COUNTER, t.param, t.factors)
+                for t in model.transitions if t.target == target and t.source is not None]
+    return Model(f"{model.name}+{COUNTER}", model.compartments + (COUNTER,), model.parameters,
+                 model.transitions + tuple(counters))
+
+
+class Problem:
+    """
+    Données à ajuster : cases[k] nouveaux cas sur (t[k], t[k + 1]] (len(t) = len(cases) + 1),
+    depuis l'état y0 à t[0]. params donne tous les paramètres du modèle ; seuls ceux de fit sont ajustés,
+    en partant de params et dans un facteur REACH autour (params en donne l'ordre de grandeur : les
+    plages des sliders contiennent des valeurs où l'épidémie est si rapide que la résolution n'aboutit pas).
+    """
+
+    def __init__(self, model, y0, t, cases, params, fit=FIT, loss="poisson"):
+        if model.contacts is not None:
+            # Dans un débit à groupes, seule la source est lue dans son groupe : un compteur sans source
+            # lirait tous ses facteurs à travers les contacts
+            raise ValueError("Ajustement indisponible pour un modèle à groupes (cas déclarés par groupe non pris en charge)")
+        if loss not in LOSSES:
+            raise ValueError(f"Perte inconnue : {loss!r} ({', '.join(LOSSES)})")
+        self.model = model
+        self.counting = counting(model)
+        self.y0 = np.append(np.asarray(y0, dtype=float), 0.)
+        self.t = np.asarray(t, dtype=float)
+        self.cases = np.asarray(cases, dtype=float)
+        if len(self.t) != len(self.cases) + 1:
+            raise ValueError("Il faut un instant de plus que de valeurs de cas (t[0] : début)")
+        self.params = np.asarray(params, dtype=float)
+        self.fit = tuple(p for p in fit if p in model.parameters)
+        self.fit_index = np.array([model.parameters.index(p) for p in self.fit], dtype=np.intp)
+        guess = self.params[self.fit_index]
+        if (guess <= 0).any():
+            raise ValueError("Les paramètres ajustés doivent partir d'une valeur strictement positive")
+        ranges = np.array([RANGES[p] for p in self.fit], dtype=float).reshape(-1, 2)
+        self.bounds = np.column_stack((np.maximum(ranges[:, 0], guess / REACH), np.minimum(ranges[:, 1], guess * REACH)))
+        self.loss = loss
+
+    def full(self, values):
+        """
+        Tous les paramètres du modèle, ceux de fit remplacés par values.
+        """
+        params = self.params.copy()
+        params[self.fit_index] = values
+        return params
+
+    def simulate(self, values):
+        """
+        Nouveaux cas du modèle sur chaque intervalle et leurs dérivées par rapport aux paramètres de fit :
+        tableaux (intervalles,) et (intervalles, paramètres ajustés).
+        """
+        params = self.full(values)
+        n, k = len(self.y0), len(self.fit)
+
+        evaluations = 0
+
+        def rhs(_t, z):
+            nonlocal evaluations
+            evaluations += 1
+            if evaluations > MAX_EVALUATIONS:
+                raise RuntimeError(f"Résolution abandonnée après {MAX_EVALUATIONS} évaluations")
+            y, s = z[:n], z[n:].reshape(n, k)
+            ds = self.counting.jacobian(y, params) @ s + self.counting.parameter_jacobian(y)[:, self.fit_index]
+            return np.concatenate((self.counting.rhs(y, params), ds.ravel()))
+
+        z0 = np.concatenate((self.y0, np.zeros(n * k)))
+        solution = solve_ivp(rhs, (self.t[0], self.t[-1]), z0, method=METHOD, t_eval=self.t, rtol=RTOL, atol=ATOL)
+        if not solution.success:
+            raise RuntimeError(solution.message)
+        cumulated = solution.y[n - 1]
+        sensitivity = solution.y[n:].reshape(n, k, len(solution.t))[n - 1]
+        return np.diff(cumulated), np.diff(sensitivity, axis=1).T
+
+    def objective(self, values):
+        """
+        (perte, gradient) pour les paramètres ajustés values.
+        """
+        incidence, sensitivity = self.simulate(values)
+        if self.loss == "squares":
+            residual = incidence - self.cases
+            return float(residual @ residual), 2 * residual @ sensitivity
+        # Poisson : somme de mu - k log mu (le terme log k! ne dépend pas des paramètres)
+        mu = np.maximum(incidence, 1e-12)
+        return float(np.sum(mu - self.cases * np.log(mu))), (1 - self.cases / mu) @ sensitivity
+
+    def starts(self, count, seed=None):
+        """
+        count points de départ tirés log-uniformément entre les bornes.
+        """
+        rng = np.random.default_rng(seed)
+        low, high = np.log(self.bounds).T
+        return np.exp(low + (high - low) * rng.random((count, len(self.fit))))
+
+
+def local(problem, start):
+    """
+    L-BFGS-B depuis start, sur le logarithme des paramètres ajustés (ils s'étalent sur plusieurs ordres
+    de grandeur). Retourne le scipy.optimize.OptimizeResult, x repassé en échelle naturelle.
+
+    Une résolution abandonnée est remplacée par une pénalité qui croît avec la distance au dernier point
+    résolu : la recherche linéaire recule au lieu de s'arrêter. Si start lui-même ne peut pas être résolu,
+    le résultat est un échec (fun infini, success faux) plutôt qu'une exception, pour ne pas perdre
+    les autres départs de calibrate.
+    """
+    low, high = problem.bounds.T
+    last = {}
+
+    def objective(log_values):
+        values = np.exp(log_values)
+        try:
+            loss, gradient = problem.objective(values)
+        except RuntimeError:
+            if not last:
+                raise
+            distance = log_values - last["x"]
+            return last["loss"] + PENALTY * (1 + distance @ distance), 2 * PENALTY * distance
+        last.update(x=log_values, loss=loss)
+        return loss, gradient * values
+
+    start = np.clip(start, low, high)
+    try:
+        result = minimize(objective, np.log(start), jac=True, method="L-BFGS-B",
+                          bounds=list(zip(np.log(low), np.log(high))), options={"ftol": FTOL, "maxiter": MAX_ITERATIONS})
+    except RuntimeError as error:
+        # Seule la première évaluation laisse passer l'erreur (il n'y a pas encore de point résolu)
+        return OptimizeResult(x=start, fun=np.inf, jac=None, success=False, status=-1, nit=0, nfev=1,
+                              message=f"Départ non résolu : {error}")
+    result.x = np.exp(result.x)
+    return result
+
+
+class Fit:
+    """
+    Résultat d'un ajustement : params (tous les paramètres du modèle), loss et les résultats de chaque départ.
+    RuntimeError si aucun départ n'a pu être résolu.
+    """
+
+    def __init__(self, problem, results):
+        self.problem = problem
+        self.results = sorted(results, key=lambda r: r.fun)
+        if not np.isfinite(self.results[0].fun):
+            raise RuntimeError(f"Aucun des {len(self.results)} départs n'a pu être résolu ({self.results[0].message})")
+        self.best = self.results[0]
+        self.params = problem.full(self.best.x)
+        self.loss = float(self.best.fun)
+
+    def __repr__(self):
+        values = ", ".join(f"{p}={v:.4g}" for p, v in zip(self.problem.model.parameters, self.params))
+        return f"Fit({self.problem.model.name}, {values}, loss={self.loss:.6g})"
+
+    def incidence(self):
+        return self.problem.simulate(self.best.x)[0]
+
+
+def calibrate(problem, starts=STARTS, seed=None, processes=None):
+    """
+    Ajustement multi-départs : un L-BFGS-B par point de départ, en parallèle. Le point params
+    du problème est toujours l'un des départs.
+    """
+    points = np.vstack([problem.params[problem.fit_index], problem.starts(starts - 1, seed)])
+    with ProcessPoolExecutor(processes) as pool:
+        results = list(pool.map(local, [problem] * len(points), points))
+    return Fit(problem, results)
+
+
+def refit(previous, t, cases):
+    """
+    Réajuste sur des données complétées (mêmes modèle, y0 et t[0]) en repartant de l'ajustement
+    previous : un seul départ, proche de l'optimum, suffit en général.
+    """
+    old = previous.problem
+    problem = Problem(old.model, old.y0[:-1], t, cases, previous.params, old.fit, old.loss)
+    return Fit(problem, [local(problem, previous.best.x)])
+
+
+def load(path):
+    """
+    Fichier CSV de deux colonnes « t,cas » avec en-tête : la première ligne donne t[0] (ses cas sont ignorés),
+    chacune des suivantes les nouveaux cas depuis la ligne précédente.
+    """
+    data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    return data[:, 0], data[1:, 1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ajuste les paramètres d'un modèle à des nouveaux cas déclarés.")
+    parser.add_argument("data", nargs="?", default=None,
+                        help="CSV t,cas ; sans fichier, données synthétiques tirées du modèle avec --truth")
+    parser.add_argument("--model", default="SEIR", choices=sorted(MODELS))
+    parser.add_argument("--y0", type=float, nargs="+", default=[995, 0, 5, 0])
+    parser.add_argument("--params", type=float, nargs="+", default=[0.5, 0.0005, 0.1, 0.01, 0.01],
+                        help="Valeurs fixées et départ de l'ajustement")
+    parser.add_argument("--truth", type=float, nargs="+", default=[0.2, 0.0004, 0.15, 0.005, 0.02])
+    parser.add_argument("--days", type=int, default=100)
+    parser.add_argument("--fit", nargs="+", default=list(FIT))
+    parser.add_argument("--loss", default="poisson", choices=LOSSES)
+    parser.add_argument("--starts", type=int, default=STARTS)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = MODELS[args.model]
+    if args.data:
+        t, cases = load(args.data)
+    else:
+        t = np.arange(args.days + 1.)
+        truth = Problem(model, args.y0, t, np.zeros(args.days), args.truth, ())
+        cases = np.random.default_rng(args.seed).poisson(truth.simulate(np.empty(0))[0])
+
+    start = time.perf_counter()
+    fit = calibrate(Problem(model, args.y0, t, cases, args.params, args.fit, args.loss),
+                    args.starts, args.seed, args.processes)
+    print(f"{fit} ({args.starts} départs, {time.perf_counter() - start:.2f} s)")
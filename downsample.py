@@ -0,0 +1,47 @@
+import numpy as np
+
+import kernels
+
+POINTS = 1000  # Points gardés par courbe à l'affichage
+
+
+def lttb_indices(x, y, n=POINTS):
+    """
+    Indices des n points gardés par Largest-Triangle-Three-Buckets.
+
+    Le premier et le dernier point sont gardés ; les autres sont répartis en n - 2 paquets
+    consécutifs, et dans chaque paquet on garde le point qui forme le plus grand triangle avec
+    le point gardé précédent et la moyenne du paquet suivant. Les pics et les creux restent visibles.
+    """
+    length = len(y)
+    if n >= length or n < 3:
+        return np.arange(length)
+    edges = np.linspace(1, length - 1, n - 1).astype(np.intp)
+    index = np.empty(n, dtype=np.intp)
+    index[0], index[-1] = 0, length - 1
+
+    # Moyenne de chaque paquet, calculées d'un coup (le dernier paquet est le dernier point)
+    sizes = np.diff(np.append(edges, length))
+    mean_x = np.add.reduceat(x, edges) / sizes
+    mean_y = np.add.reduceat(y, edges) / sizes
+    if kernels.JIT:
+        kernels.lttb(x, y, edges, mean_x, mean_y, index)
+        return index
+
+    a = 0
+    for k in range(n - 2):
+        start, stop = edges[k], edges[k + 1]
+        bx, by = mean_x[k + 1], mean_y[k + 1]
+        area = np.abs((x[a] - bx) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (by - y[a]))
+        a = start + int(np.argmax(area))
+        index[k + 1] = a
+    return index
+
+
+def lttb(x, y, n=POINTS):
+    """
+    Courbe (x, y) réduite à n points par lttb_indices, pour set_data.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    index = lttb_indices(x, y, n)
+    return x[index], y[index]
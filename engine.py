@@ -0,0 +1,186 @@
+import numpy as np
+
+
+# --- Déclaration ---
+class Transition:
+    """
+    Flux entre deux compartiments, de débit param * produit des facteurs.
+    Une source (ou une cible) à None représente l'extérieur du modèle : naissances, morts.
+    Par défaut le seul facteur est le compartiment source (flux linéaire).
+    """
+
+    def __init__(self, source, target, param, factors=None):
+        self.source = source
+        self.target = target
+        self.param = param
+        self.factors = tuple(factors) if factors is not None else (source,)
+
+    def __repr__(self):
+        return f"Transition({self.source!r}, {self.target!r}, {self.param!r}, {self.factors!r})"
+
+
+def births(param, target, compartments):
+    """
+    Naissances param * (X1 + X2 + ...) vers le compartiment target.
+    """
+    return [Transition(None, target, param, (c,)) for c in compartments]
+
+
+def deaths(param, compartments):
+    """
+    Mortalité naturelle param * X pour chaque compartiment X.
+    """
+    return [Transition(c, None, param) for c in compartments]
+
+
+# --- Compilation ---
+class Model:
+    """
+    Modèle à compartiments compilé une seule fois en tableaux NumPy.
+
+    - factors : indices des compartiments multipliés dans chaque débit (padding = facteur 1)
+    - param_index : indice du paramètre de chaque transition
+    - stoichiometry : matrice (transitions x compartiments) des variations
+
+    Le second membre s'écrit alors dy/dt = stoichiometry.T @ débits, sans boucle Python
+    sur les compartiments. Les compartiments (et les paramètres) sont sur le premier axe ;
+    les axes suivants, s'il y en a, sont des lots résolus en même temps (y de forme
+    (compartiments, n_sets), comme l'option vectorized de solve_ivp).
+
+    Avec une matrice de contacts K x K (voir structured), la population est divisée en K groupes
+    (âges...) : y est de forme (compartiments, K[, n_sets]) et les paramètres (paramètres,) communs
+    ou (paramètres, K[, n_sets]) propres à chaque groupe. Dans une transition à plusieurs facteurs,
+    ceux qui ne sont pas la source sont lus à travers les contacts : beta * S_k * somme_j C_kj I_j.
+    Ces compartiments mélangés (contacts @ y) sont calculés en un seul produit matriciel.
+    """
+
+    def __init__(self, name, compartments, parameters, transitions, contacts=None):
+        self.name = name
+        self.compartments = tuple(compartments)
+        self.parameters = tuple(parameters)
+        self.transitions = tuple(transitions)
+        self.contacts = None if contacts is None else np.asarray(contacts, dtype=float)
+
+        n = len(self.compartments)
+        index = {c: i for i, c in enumerate(self.compartments)}
+        order = max(len(t.factors) for t in self.transitions)
+        # Lignes de l'état complété : compartiments, compartiments mélangés s'il y a des contacts, puis 1
+        self.padding = n if self.contacts is None else 2 * n
+
+        self.factors = np.full((len(self.transitions), order), self.padding, dtype=np.intp)
+        self.param_index = np.empty(len(self.transitions), dtype=np.intp)
+        self.stoichiometry = np.zeros((len(self.transitions), n))
+        for j, t in enumerate(self.transitions):
+            self.factors[j, :len(t.factors)] = [
+                index[c] + n if self.contacts is not None and len(t.factors) > 1 and c != t.source else index[c]
+                for c in t.factors]
+            self.param_index[j] = self.parameters.index(t.param)
+            if t.source is not None:
+                self.stoichiometry[j, index[t.source]] -= 1
+            if t.target is not None:
+                self.stoichiometry[j, index[t.target]] += 1
+
+    def __repr__(self):
+        if self.contacts is not None:
+            return f"Model({self.name!r}, {self.compartments}, {self.parameters}, groupes={len(self.contacts)})"
+        return f"Model({self.name!r}, {self.compartments}, {self.parameters})"
+
+    def index(self, compartment):
+        return self.compartments.index(compartment)
+
+    def structured(self, contacts):
+        """
+        Le même modèle sur K groupes couplés par la matrice de contacts (K x K).
+        """
+        return Model(self.name, self.compartments, self.parameters, self.transitions, contacts)
+
+    def coefficients(self, params):
+        """
+        Paramètre de chaque transition, (transitions[, lots]). Avec des groupes, des paramètres
+        communs (sans axe des groupes, ou de taille 1) sont répétés sur l'axe des groupes.
+        """
+        coefficients = np.asarray(params, dtype=float)[self.param_index]
+        if self.contacts is not None:
+            if coefficients.ndim == 1:
+                coefficients = coefficients[:, None]
+            shape = coefficients.shape[:1] + (len(self.contacts),) + coefficients.shape[2:]
+            coefficients = np.broadcast_to(coefficients, shape)
+        return coefficients
+
+    def mix(self, y):
+        """
+        Compartiments vus à travers les contacts : (contacts @ y) sur l'axe des groupes.
+        """
+        return np.moveaxis(np.tensordot(self.contacts, y, axes=(1, 1)), 0, 1)
+
+    def pad(self, y):
+        """
+        Etat complété des lignes lues par factors : y, contacts @ y s'il y a des groupes, puis 1.
+        """
+        rows = [y] if self.contacts is None else [y, self.mix(y)]
+        return np.concatenate(rows + [np.ones((1,) + y.shape[1:])])
+
+    def rates(self, y, params):
+        """
+        Débit de chaque transition pour l'état y et les paramètres params.
+        Des paramètres sans axe de lot sont partagés par tous les états du lot.
+        """
+        y = np.asarray(y, dtype=float)
+        # Ligne de 1 pour les facteurs absents (transitions d'ordre inférieur)
+        padded = self.pad(y)
+        rates = self.coefficients(params)
+        rates = rates.reshape(rates.shape + (1,) * (y.ndim - rates.ndim))
+        for column in self.factors.T:
+            rates = rates * padded[column]
+        return rates
+
+    def rhs(self, y, params):
+        """
+        Second membre dy/dt du système d'équations différentielles.
+        """
+        return np.tensordot(self.stoichiometry, self.rates(y, params), axes=(0, 0))
+
+    def jacobian(self, y, params):
+        """
+        Jacobien analytique d(dy/dt)/dy (compartiments x compartiments[, lots]) pour un état y.
+        La dérivée d'un débit k * y_a * y_b par rapport à y_a est k * y_b :
+        pour chaque position de facteur, on multiplie les autres facteurs.
+        Avec des groupes, il est de forme (compartiments, K, compartiments, K[, lots]) (reshape(n * K, n * K)
+        donne celui de l'état aplati) : un facteur mélangé (contacts @ y)[a, k] a pour dérivée contacts[k, l]
+        par rapport à y[a, l], les autres ne dépendent que de leur propre groupe.
+        """
+        y = np.asarray(y, dtype=float)
+        padded = self.pad(y)
+        coefficients = self.coefficients(params)
+        coefficients = coefficients.reshape(coefficients.shape + (1,) * (y.ndim - coefficients.ndim))
+        rows = np.arange(len(self.transitions))
+        # Dérivées des débits par rapport à chaque ligne de l'état complété
+        derivatives = np.zeros((len(self.transitions), len(padded)) + y.shape[1:])
+        for m in range(self.factors.shape[1]):
+            others = coefficients * np.ones(y.shape[1:])
+            for column in np.delete(self.factors, m, axis=1).T:
+                others = others * padded[column]
+            derivatives[rows, self.factors[:, m]] += others
+        n = len(self.compartments)
+        if self.contacts is None:
+            return np.tensordot(self.stoichiometry, derivatives[:, :n], axes=(0, 0))
+        trailing = (1,) * (y.ndim - 2)
+        groups = np.eye(len(self.contacts)).reshape(self.contacts.shape + trailing)
+        contacts = self.contacts.reshape(self.contacts.shape + trailing)
+        derivatives = derivatives[:, :n, :, None] * groups + derivatives[:, n:2 * n, :, None] * contacts
+        return np.moveaxis(np.tensordot(self.stoichiometry, derivatives, axes=(0, 0)), 2, 1)
+
+    def parameter_jacobian(self, y, params=None):
+        """
+        Dérivée d(dy/dt)/dparams (compartiments x paramètres[, lots]) pour un état y.
+        Chaque débit est linéaire en son paramètre : sa dérivée est le produit de ses facteurs,
+        qui ne dépend pas des paramètres (params n'est gardé que pour la symétrie avec jacobian).
+        Avec des groupes, elle est de forme (compartiments, K, paramètres[, lots]), par rapport aux paramètres
+        communs à tous les groupes (celle par rapport au paramètre du seul groupe k est la tranche du groupe k).
+        """
+        y = np.asarray(y, dtype=float)
+        products = self.rates(y, np.ones(len(self.parameters)))
+        derivatives = np.zeros((len(self.transitions), len(self.parameters)) + y.shape[1:])
+        derivatives[np.arange(len(self.transitions)), self.param_index] = products
+        derivatives = np.tensordot(self.stoichiometry, derivatives, axes=(0, 0))
+        return derivatives if self.contacts is None else np.moveaxis(derivatives, 1, 2)
@@ -0,0 +1,59 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from population import Population
+
+QUANTILES = (0.05, 0.5, 0.95)
+
+
+def replicate(seed, ticks, settings):
+    """
+    Une réalisation de la simulation de population.
+    Retourne les effectifs (S, E, I, R) avant chaque étape : tableau (ticks, 4).
+    """
+    pop = Population(**settings, seed=seed)
+    counts = np.empty((ticks, 4), dtype=np.int64)
+    for tick in range(ticks):
+        counts[tick] = pop.counts()
+        pop.tick()
+    return counts
+
+
+def stream(n, ticks, settings, seed=0, processes=None):
+    """
+    Lance n réalisations indépendantes dans un pool de processus.
+    Générateur de (numéro, effectifs) dans l'ordre où les réalisations se terminent.
+    La graine de chaque réalisation dérive de la graine maîtresse et de son numéro seulement :
+    le résultat ne dépend ni du nombre de processus ni de l'ordre d'exécution.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(n)
+    with ProcessPoolExecutor(processes) as pool:
+        futures = {pool.submit(replicate, s, ticks, settings): i for i, s in enumerate(seeds)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+class Ensemble:
+    """
+    Effectifs de toutes les réalisations : counts de forme (réalisations, ticks, 4).
+    """
+
+    def __init__(self, counts, quantiles=QUANTILES):
+        self.counts = counts
+        self.mean = counts.mean(axis=0)
+        self.quantiles = dict(zip(quantiles, np.quantile(counts, quantiles, axis=0)))
+
+
+def run(n, ticks, settings, seed=0, processes=None, quantiles=QUANTILES, path=None):
+    """
+    Lance n réalisations et calcule la moyenne et les quantiles des effectifs à chaque tick.
+    Avec path, les effectifs sont écrits dans un fichier .npy projeté en mémoire plutôt qu'en RAM.
+    """
+    if path is None:
+        counts = np.empty((n, ticks, 4), dtype=np.int64)
+    else:
+        counts = np.lib.format.open_memmap(path, mode="w+", dtype=np.int64, shape=(n, ticks, 4))
+    for i, result in stream(n, ticks, settings, seed, processes):
+        counts[i] = result
+    return Ensemble(counts, quantiles)
@@ -0,0 +1,183 @@
+"""
+Détection des étapes clés d'une épidémie : pic des infectés, passage sous une personne infectée,
+seuil d'immunité collective, état stationnaire.
+
+Un événement est une fonction g(y, f) de l'état y et de sa dérivée f = dy/dt, qui s'annule à l'instant
+cherché. Entre deux pas, un changement de signe de g est localisé par recherche de racine (brentq)
+sur l'interpolation d'Hermite cubique du pas : l'instant ne dépend pas de la grille de sortie.
+Un événement terminal arrête l'intégration.
+"""
+import numpy as np
+from scipy.optimize import brentq
+
+from integrators import Stepper, hermite
+
+EXTINCTION = 1.  # Nombre d'infectés sous lequel l'épidémie est considérée éteinte
+XTOL = 1e-10  # Précision de la recherche de racine (en fraction de pas)
+
+
+class Event:
+    """
+    Evénement g(y, f) = 0. direction -1 (ou 1) ne retient que les passages de positif à négatif
+    (ou l'inverse), 0 les deux. terminal arrête l'intégration à la première occurrence.
+    """
+
+    def __init__(self, name, function, direction=0, terminal=False):
+        self.name = name
+        self.function = function
+        self.direction = direction
+        self.terminal = terminal
+
+    def __repr__(self):
+        return f"Event({self.name!r}, direction={self.direction}, terminal={self.terminal})"
+
+    def crossed(self, g_old, g_new):
+        if self.direction <= 0 and g_old > 0 >= g_new:
+            return True
+        return self.direction >= 0 and g_old < 0 <= g_new
+
+
+def herd_threshold(model, params):
+    """
+    Nombre de sains S* sous lequel un infecté en contamine moins d'un (R effectif < 1) :
+    S* = (sorties de I) / beta, multiplié par (sorties de E) / alpha s'il y a une incubation.
+    None si beta ou alpha est nul : sans transmission (ou sans sortie de E), il n'y a pas de seuil.
+    """
+    params = dict(zip(model.parameters, params))
+    if params["beta"] == 0 or params.get("alpha", 1.) == 0:
+        return None
+    micro = params.get("micro", 0.)
+    threshold = (params["gamma"] + micro + params.get("delta", 0.)) / params["beta"]
+    if "alpha" in params:
+        threshold *= (params["alpha"] + micro) / params["alpha"]
+    return threshold
+
+
+def milestones(model, params, extinction=EXTINCTION, steady=None, terminal=False):
+    """
+    Evénements usuels du modèle : pic des infectés, extinction (I < extinction), seuil d'immunité
+    collective (S < S*, absent si herd_threshold n'en donne pas) et, si steady est donné, état stationnaire
+    (max |dy/dt| < steady). terminal arrête l'intégration à l'extinction ou à l'état stationnaire.
+    """
+    s, i = model.index("S"), model.index("I")
+    threshold = herd_threshold(model, params)
+    events = [
+        Event("peak", lambda y, f: f[i], direction=-1),
+        Event("extinction", lambda y, f: y[i] - extinction, direction=-1, terminal=terminal),
+    ]
+    if threshold is not None:
+        events.append(Event("herd_immunity", lambda y, f: y[s] - threshold, direction=-1))
+    if steady is not None:
+        events.append(Event("steady", lambda y, f: np.abs(f).max() - steady, direction=-1, terminal=terminal))
+    return events
+
+
+class Detector:
+    """
+    Suit les événements pas à pas et garde leurs occurrences {nom: [(t, y), ...]}.
+    """
+
+    def __init__(self, model, params, events):
+        self.model = model
+        self.params = params
+        self.events = list(events)
+        self.found = {e.name: [] for e in self.events}
+        self.values = None
+
+    def start(self, y, f):
+        self.values = [e.function(y, f) for e in self.events]
+
+    def step(self, t0, y0, f0, t1, y1, f1):
+        """
+        Teste le pas [t0, t1]. Retourne vrai si un événement terminal s'y produit.
+        """
+        values = [e.function(y1, f1) for e in self.events]
+        stop = False
+        for e, g_old, g_new in zip(self.events, self.values, values):
+            if e.crossed(g_old, g_new):
+                t, y = self.locate(e, t0, y0, f0, t1, y1, f1)
+                self.found[e.name].append((t, y))
+                stop |= e.terminal
+        self.values = values
+        return stop
+
+    def locate(self, event, t0, y0, f0, t1, y1, f1):
+        h = t1 - t0
+
+        def state(theta):
+            return hermite(theta, h, y0, f0, y1, f1)
+
+        def g(theta):
+            y = state(theta)
+            return event.function(y, self.model.rhs(y, self.params))
+
+        # L'interpolant peut ne pas changer de signe là où les points du pas le font : on garde la fin du pas
+        theta = brentq(g, 0., 1., xtol=XTOL) if g(0.) * g(1.) < 0 else 1.
+        return t0 + theta * h, state(theta)
+
+    def first(self, name):
+        """
+        (t, y) de la première occurrence de l'événement, ou None.
+        """
+        return self.found[name][0] if self.found[name] else None
+
+
+def integrate_events(model, y0, params, h, steps, events, method="euler"):
+    """
+    Comme integrators.integrate (un seul jeu de paramètres), en suivant les événements.
+    Retourne (y de forme (pas effectués + 1, compartiments), Detector) : l'intégration s'arrête
+    à la fin du pas où un événement terminal se produit.
+    """
+    stepper = Stepper(model, params, method)
+    detector = Detector(model, params, events)
+    y = np.empty((steps + 1, len(model.compartments)))
+    y[0] = y0
+    f, f_new = np.empty(len(model.compartments)), np.empty(len(model.compartments))
+    stepper.derivative(y[0], f)
+    detector.start(y[0], f)
+    for o in range(steps):
+        # Le premier étage est f(y), déjà calculé pour les événements
+        np.copyto(stepper.stages[0], f)
+        stepper.step(y[o], h, y[o + 1], known=True)
+        stepper.derivative(y[o + 1], f_new)
+        if detector.step(o * h, y[o], f, (o + 1) * h, y[o + 1], f_new):
+            return y[:o + 2], detector
+        f, f_new = f_new, f
+    return y, detector
+
+
+def for_solve_ivp(model, params, events):
+    """
+    Fonctions d'événement au format de solve_ivp (attributs terminal et direction).
+    """
+    def wrap(event):
+        def function(_t, y, *_args):
+            return event.function(y, model.rhs(y, params))
+        function.terminal = event.terminal
+        function.direction = event.direction
+        return function
+    return [wrap(e) for e in events]
+
+
+def from_solve_ivp(solution, events):
+    """
+    Occurrences {nom: [(t, y), ...]} lues dans le résultat de solve_ivp.
+    """
+    return {e.name: list(zip(t, y)) for e, t, y in zip(events, solution.t_events, solution.y_events)}
+
+
+def summary(model, found):
+    """
+    Instant et valeur du pic des infectés, instants d'extinction, d'immunité collective et d'état stationnaire
+    (None s'ils ne se produisent pas).
+    """
+    i = model.index("I")
+    found = found.found if isinstance(found, Detector) else found
+    first = {name: occurrences[0] if occurrences else None for name, occurrences in found.items()}
+    row = {"t_peak": None, "peak_I": None}
+    if first.get("peak") is not None:
+        row["t_peak"], row["peak_I"] = float(first["peak"][0]), float(first["peak"][1][i])
+    for name in ("extinction", "herd_immunity", "steady"):
+        if name in first:
+            row[f"t_{name}"] = float(first[name][0]) if first[name] is not None else None
+    return row
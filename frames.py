@@ -0,0 +1,58 @@
+import os
+from collections import deque
+from multiprocessing import get_context
+
+# Processus neufs (et non copiés par fork) : ils ne partagent ni la fenêtre ni l'interpréteur Tk du parent
+CONTEXT = "spawn"
+
+
+def headless():
+    """
+    Initialisation d'un processus du pool : rendu Agg, sans fenêtre.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def parallel_frames(make_frame, times, processes=None, window=None):
+    """
+    Calcule make_frame(t) pour chaque t dans un pool de processus et génère les (t, image) dans l'ordre.
+    Au plus window images (par défaut deux par processus) sont en cours de calcul ou en attente :
+    la mémoire utilisée ne dépend pas de la longueur de l'animation.
+    make_frame doit être une fonction de niveau module : chaque processus réimporte son module
+    (le script principal sous le nom __mp_main__), qui recrée la figure, puis la retrouve par son nom.
+    Ce module doit donc choisir le backend Agg quand __name__ == "__mp_main__".
+    """
+    processes = processes or os.cpu_count()
+    window = window or 2 * processes
+    with get_context(CONTEXT).Pool(processes, initializer=headless) as pool:
+        pending = deque()
+        for t in times:
+            pending.append((t, pool.apply_async(make_frame, (t,))))
+            if len(pending) >= window:
+                t, result = pending.popleft()
+                yield t, result.get()
+        while pending:
+            t, result = pending.popleft()
+            yield t, result.get()
+
+
+class FrameSource:
+    """
+    Fonction make_frame pour moviepy.VideoClip dont les images sont calculées en parallèle.
+    Les images sont demandées dans l'ordre par l'export ; la dernière est gardée car VideoClip
+    demande l'image t = 0 une première fois pour connaître la taille de l'animation.
+    """
+
+    def __init__(self, make_frame, duration, fps, processes=None, window=None):
+        times = [i / fps for i in range(int(duration * fps) + 1)]
+        self.frames = parallel_frames(make_frame, times, processes, window)
+        self.t, self.frame = None, None
+
+    def __call__(self, t):
+        while self.t is None or self.t < t - 1e-9:
+            self.t, self.frame = next(self.frames)
+        return self.frame
+
+    def close(self):
+        self.frames.close()
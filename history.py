@@ -0,0 +1,72 @@
+import numpy as np
+
+BLOCK = 4096  # Lignes gardées en mémoire avant écriture sur le disque
+HEADER_SIZE = 128  # Taille réservée à l'entête du fichier .npy (multiple de 64)
+
+
+def header(rows, columns, dtype):
+    """
+    Entête .npy (version 1.0) de taille fixe HEADER_SIZE, réécrite à chaque ajout de lignes.
+    """
+    d = {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": (rows, columns)}
+    text = repr(d).ljust(HEADER_SIZE - 11) + "\n"
+    return np.lib.format.MAGIC_PREFIX + b"\x01\x00" + len(text).to_bytes(2, "little") + text.encode("latin1")
+
+
+class History:
+    """
+    Historique d'une simulation écrit au fil de l'eau dans un fichier .npy.
+
+    Les lignes sont accumulées dans un bloc NumPy de taille fixe puis ajoutées à la fin du fichier :
+    la mémoire utilisée ne dépend pas de la durée de la simulation.
+    Le fichier se relit sans tout charger avec load() (tableau projeté en mémoire).
+    """
+
+    def __init__(self, path, columns=5, dtype=np.float64, block=BLOCK):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.buffer = np.empty((block, columns), dtype=self.dtype)
+        self.count = 0
+        self.rows = 0
+        self.file = open(path, "wb")
+        self.file.write(header(0, columns, self.dtype))
+
+    def __len__(self):
+        return self.rows + self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def append(self, row):
+        self.buffer[self.count] = row
+        self.count += 1
+        if self.count == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        """
+        Ecrit le bloc en cours à la fin du fichier et met à jour le nombre de lignes de l'entête.
+        """
+        if self.count:
+            self.file.write(self.buffer[:self.count].tobytes())
+            self.rows += self.count
+            self.count = 0
+        self.file.seek(0)
+        self.file.write(header(self.rows, self.buffer.shape[1], self.dtype))
+        self.file.seek(0, 2)
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+def load(path):
+    """
+    Relit un historique sans le charger en mémoire.
+    """
+    return np.load(path, mmap_mode="r")
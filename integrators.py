@@ -0,0 +1,270 @@
+import numpy as np
+
+import kernels
+
+# Tableaux de Butcher (a, b) des méthodes explicites de Runge-Kutta.
+# Les modèles sont autonomes (pas de dépendance en t) : les c_i sont inutiles.
+TABLEAUX = {
+    # Méthode d'euler explicite (à gauche)
+    "euler": ([], [1.]),
+    # Méthode de Heun (euler améliorée, moyenne des pentes à gauche et à droite)
+    "heun": ([[1.]], [1/2, 1/2]),
+    # Méthode du point milieu
+    "midpoint": ([[1/2]], [0., 1.]),
+    # Runge-Kutta classique d'ordre 4
+    "rk4": ([[1/2], [0., 1/2], [0., 0., 1.]], [1/6, 1/3, 1/3, 1/6]),
+}
+
+# Paires emboîtées (a, b, b_chapeau, ordre de b_chapeau) pour le pas adaptatif.
+# b_chapeau donne une solution d'ordre inférieur : l'écart entre les deux estime l'erreur.
+EMBEDDED = {
+    # Heun (ordre 2) avec euler (ordre 1)
+    "heun_euler": ([[1.]], [1/2, 1/2], [1., 0.], 1),
+    # Bogacki-Shampine (ordre 3) avec une méthode d'ordre 2, le dernier étage est f(y suivant)
+    "bogacki_shampine": ([[1/2], [0., 3/4], [2/9, 1/3, 4/9]], [2/9, 1/3, 4/9, 0.], [7/24, 1/4, 1/3, 1/8], 2),
+}
+TABLEAUX.update({name: (a, b) for name, (a, b, _, _) in EMBEDDED.items()})
+
+# Tolérances par défaut du pas adaptatif
+RTOL = 1e-3
+ATOL = 1e-6
+MAX_STEPS = 10**6  # Pas (acceptés et rejetés) au-delà desquels une résolution adaptative est abandonnée
+MIN_STEP = 1e-12  # Pas minimal, relatif à l'instant courant
+
+
+class Stepper:
+    """
+    Intégrateur explicite de Runge-Kutta pour un modèle compilé du moteur.
+    Tous les tampons (étages, débits, facteurs) sont alloués une fois pour toutes :
+    un pas n'alloue aucun tableau. y est de forme (compartiments,) ou (compartiments, n_sets),
+    ou (compartiments, groupes[, n_sets]) pour un modèle à groupes (Model.structured).
+    """
+
+    def __init__(self, model, params, method="euler"):
+        if method not in TABLEAUX:
+            raise ValueError(f"Méthode inconnue : {method!r} (parmi {', '.join(TABLEAUX)})")
+        self.model = model
+        self.method = method
+        self.a, self.b = TABLEAUX[method]
+
+        n, k = len(model.compartments), len(model.transitions)
+        self.coefficients = model.coefficients(params)
+        batch = self.coefficients.shape[1:]
+        self.transfer = np.ascontiguousarray(model.stoichiometry.T)
+
+        # Tampons du second membre
+        self.padded = np.ones((model.padding + 1,) + batch)
+        self.gathered = np.empty((k,) + batch)
+        self.rates = np.empty((k,) + batch)
+        # Tampons des étages
+        self.stages = np.empty((len(self.b), n) + batch)
+        self.stage_y = np.empty((n,) + batch)
+        self.scaled = np.empty((n,) + batch)
+
+    def derivative(self, y, out):
+        """
+        Ecrit dy/dt dans out.
+        """
+        n = len(y)
+        self.padded[:n] = y
+        # Compartiments mélangés : contacts @ y sur l'axe des groupes
+        if self.model.contacts is not None and y.ndim == 2:
+            np.matmul(y, self.model.contacts.T, out=self.padded[n:2 * n])
+        elif self.model.contacts is not None:
+            np.matmul(self.model.contacts, y, out=self.padded[n:2 * n])
+        np.copyto(self.rates, self.coefficients)
+        for column in self.model.factors.T:
+            np.take(self.padded, column, axis=0, out=self.gathered)
+            self.rates *= self.gathered
+        if self.rates.ndim > 2:
+            # Groupes et lots aplatis en un seul axe pour le produit matriciel
+            np.matmul(self.transfer, self.rates.reshape(len(self.rates), -1), out=out.reshape(len(out), -1))
+        else:
+            np.matmul(self.transfer, self.rates, out=out)
+        return out
+
+    def combine(self, y, h, weights, out):
+        """
+        out = y + h * somme(weights[j] * étage j). Avec y à None, seule la somme est calculée.
+        """
+        if y is None:
+            out.fill(0.)
+        else:
+            np.copyto(out, y)
+        for j, w in enumerate(weights):
+            if w:
+                np.multiply(self.stages[j], h * w, out=self.scaled)
+                out += self.scaled
+        return out
+
+    def step(self, y, h, out, known=False):
+        """
+        Ecrit dans out l'état après un pas de longueur h depuis y.
+        Avec known, le premier étage contient déjà f(y) et n'est pas recalculé.
+        """
+        if not known:
+            self.derivative(y, self.stages[0])
+        for i, row in enumerate(self.a, start=1):
+            self.derivative(self.combine(y, h, row, self.stage_y), self.stages[i])
+        return self.combine(y, h, self.b, out)
+
+
+def hermite(theta, h, y, f, y_new, f_new):
+    """
+    Interpolation d'Hermite cubique d'un pas de longueur h (fraction theta du pas),
+    à partir des états et des dérivées aux deux bouts.
+    """
+    return ((1 + 2 * theta) * (1 - theta) ** 2 * y + theta * (1 - theta) ** 2 * h * f
+            + theta ** 2 * (3 - 2 * theta) * y_new + theta ** 2 * (theta - 1) * h * f_new)
+
+
+def integrate(model, y0, params, h, steps, method="euler", rtol=RTOL, atol=ATOL, every=1, max_steps=MAX_STEPS):
+    """
+    Résout le modèle sur steps pas de longueur h à partir de y0.
+    Retourne un tableau préalloué (steps // every + 1, compartiments[, n_sets]) : un point tous les every pas,
+    la grille de sortie ne dépend donc pas du pas d'intégration.
+    Les méthodes de EMBEDDED passent par le pas adaptatif (au plus max_steps pas) et sont interpolées
+    sur la même grille.
+    Pour un seul jeu de paramètres, la boucle des pas est compilée si numba est installé (kernels.py).
+    """
+    if method in EMBEDDED:
+        return integrate_adaptive(model, y0, params, h * np.arange(0, steps + 1, every), method, rtol, atol,
+                                  max_steps=max_steps)[0]
+    stepper = Stepper(model, params, method)
+    if kernels.JIT and stepper.stage_y.ndim == 1:
+        a = np.zeros((len(stepper.b) - 1,) * 2)
+        for i, row in enumerate(stepper.a):
+            a[i, :len(row)] = row
+        return kernels.integrate(stepper.coefficients, model.factors, stepper.transfer, a,
+                                 np.asarray(stepper.b, dtype=float), np.asarray(y0, dtype=float), h, steps, every)
+    y = np.empty((steps // every + 1,) + stepper.stage_y.shape)
+    y[0] = y0
+    current = np.array(y[0])
+    for o in range(1, steps + 1):
+        stepper.step(current, h, current)
+        if o % every == 0:
+            y[o // every] = current
+    return y
+
+
+def integrate_at(model, y0, params, h, t, method="euler"):
+    """
+    Résout le modèle avec des pas fixes de longueur h et ne garde que les instants t
+    (croissants, t[0] = instant initial), interpolés (Hermite cubique) dans le pas qui les contient.
+    Retourne un tableau (len(t), compartiments[, n_sets]).
+    """
+    t = np.asarray(t, dtype=float)
+    stepper = Stepper(model, params, method)
+    y = np.empty_like(stepper.stage_y)
+    y[...] = y0
+    y_new, f, f_new = np.empty_like(y), np.empty_like(y), np.empty_like(y)
+    out = np.empty((len(t),) + y.shape)
+    out[0] = y
+
+    stepper.derivative(y, f)
+    i, o = 1, 0
+    while i < len(t):
+        # Le premier étage est f(y), calculé au pas précédent pour l'interpolation
+        np.copyto(stepper.stages[0], f)
+        stepper.step(y, h, y_new, known=True)
+        stepper.derivative(y_new, f_new)
+        t_now, t_next = t[0] + o * h, t[0] + (o + 1) * h
+        j = np.searchsorted(t, t_next, side="right")
+        if j > i:
+            theta = ((t[i:j] - t_now) / h).reshape((-1,) + (1,) * y.ndim)
+            out[i:j] = hermite(theta, h, y, f, y_new, f_new)
+            i = j
+        y, y_new = y_new, y
+        f, f_new = f_new, f
+        o += 1
+    return out
+
+
+def integrate_adaptive(model, y0, params, t, method="bogacki_shampine", rtol=RTOL, atol=ATOL, h0=None,
+                       detector=None, max_steps=MAX_STEPS):
+    """
+    Résout le modèle avec un pas adaptatif contrôlé par une paire emboîtée,
+    puis interpole (Hermite cubique) la solution aux instants t (croissants, t[0] = instant initial).
+    Retourne (y de forme (len(t), compartiments[, n_sets]), statistiques).
+    Les statistiques comptent les pas acceptés, les pas rejetés et les évaluations du second membre.
+    Avec un detector (events.Detector, un seul jeu de paramètres), les événements sont suivis à chaque
+    pas accepté ; après un événement terminal, y s'arrête au dernier instant de t atteint.
+    RuntimeError si le pas devient négligeable devant t (système raide ou singulier), si la solution
+    n'est plus finie ou au-delà de max_steps pas (acceptés et rejetés), comme l'échec de solve_ivp.
+    """
+    if method not in EMBEDDED:
+        raise ValueError(f"Méthode adaptative inconnue : {method!r} (parmi {', '.join(EMBEDDED)})")
+    a, b, b_hat, order = EMBEDDED[method]
+    # Premier étage identique au dernier du pas précédent (FSAL)
+    fsal = len(a) == len(b) - 1 and list(a[-1]) == list(b[:-1]) and b[-1] == 0
+    error_weights = [bj - bh for bj, bh in zip(b, b_hat)]
+
+    t = np.asarray(t, dtype=float)
+    stepper = Stepper(model, params, method)
+    y = np.empty_like(stepper.stage_y)
+    y[...] = y0
+    y_new, error = np.empty_like(y), np.empty_like(y)
+    f, f_new = np.empty_like(y), np.empty_like(y)
+    out = np.empty((len(t),) + y.shape)
+    out[0] = y
+    stats = {"steps": 0, "rejected": 0, "evaluations": 1}
+
+    stepper.derivative(y, f)
+    if detector is not None:
+        detector.start(y, f)
+    t_now, t_end, i = t[0], t[-1], 1
+    if h0 is None:
+        # Premier pas : variation relative de l'ordre de rtol
+        scale = atol + rtol * np.abs(y)
+        h0 = 0.01 * np.sqrt(np.mean((y / scale) ** 2)) / max(np.sqrt(np.mean((f / scale) ** 2)), 1e-10)
+    h = min(max(h0, 1e-6), t_end - t_now)
+
+    while i < len(t):
+        h = min(h, t_end - t_now)
+        np.copyto(stepper.stages[0], f)
+        stepper.step(y, h, y_new, known=True)
+        stepper.combine(None, h, error_weights, error)
+        stats["evaluations"] += len(b) - 1
+
+        # Norme quadratique de l'erreur relative, la pire sur l'ensemble des jeux
+        error /= atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        norm = np.sqrt(np.mean(error ** 2, axis=0)).max()
+        if stats["steps"] + stats["rejected"] >= max_steps:
+            raise RuntimeError(f"Résolution abandonnée après {max_steps} pas (t = {t_now:g})")
+        if not np.isfinite(norm):
+            # Débordement (inf, NaN) : le pas est rejeté et fortement réduit
+            norm, factor = np.inf, 0.2
+        else:
+            factor = 5. if norm == 0 else min(5., max(0.2, 0.9 * norm ** (-1 / (order + 1))))
+        if norm > 1:
+            stats["rejected"] += 1
+            h *= factor
+            if h < MIN_STEP * max(abs(t_now), 1.):
+                raise RuntimeError(f"Pas {h:.3g} trop petit à t = {t_now:g} : système trop raide ou solution non finie")
+            continue
+
+        if fsal:
+            np.copyto(f_new, stepper.stages[-1])
+        else:
+            stepper.derivative(y_new, f_new)
+            stats["evaluations"] += 1
+        stats["steps"] += 1
+        stop = detector is not None and detector.step(t_now, y, f, t_now + h, y_new, f_new)
+
+        # Sortie dense : instants demandés couverts par le pas [t_now, t_now + h]
+        t_next = t_now + h
+        j = i
+        while j < len(t) and t[j] <= t_next:
+            j += 1
+        if j > i:
+            theta = ((t[i:j] - t_now) / h).reshape((-1,) + (1,) * y.ndim)
+            out[i:j] = hermite(theta, h, y, f, y_new, f_new)
+            i = j
+        if stop:
+            return out[:i], stats
+
+        t_now = t_next
+        y, y_new = y_new, y
+        f, f_new = f_new, f
+        h *= factor
+    return out, stats
@@ -0,0 +1,147 @@
+"""
+Noyaux compilés (numba, mode nopython) des boucles chaudes : pas de Runge-Kutta explicite
+à pas fixe, contaminate() et incubate() de la simulation de population, réduction LTTB des courbes.
+
+numba est optionnel : sans lui, JIT vaut False et integrators.py, population.py et downsample.py gardent
+leur chemin NumPy. Les noyaux refont les mêmes opérations flottantes dans le même ordre,
+les résultats sont donc identiques d'un chemin à l'autre. La compilation est mise en cache
+(__pycache__) : elle n'est payée qu'une fois par machine.
+"""
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+JIT = numba is not None  # Mettre à False pour forcer le chemin NumPy
+
+
+def jit(function):
+    if numba is None:
+        return function
+    return numba.njit(cache=True)(function)
+
+
+@jit
+def derivative(coefficients, factors, transfer, padded, rates, out):
+    """
+    dy/dt dans out pour l'état contenu dans padded[:-1] (padded[-1] vaut 1).
+    """
+    for j in range(len(coefficients)):
+        rate = coefficients[j]
+        for m in range(factors.shape[1]):
+            rate *= padded[factors[j, m]]
+        rates[j] = rate
+    out[:] = np.dot(transfer, rates)
+
+
+@jit
+def combine(y, h, weights, stages, out):
+    """
+    out = y + h * somme(weights[j] * étage j), comme Stepper.combine.
+    """
+    out[:] = y
+    for j in range(len(weights)):
+        if weights[j] != 0.:
+            scale = h * weights[j]
+            for i in range(len(out)):
+                out[i] += stages[j, i] * scale
+
+
+@jit
+def integrate(coefficients, factors, transfer, a, b, y0, h, steps, every):
+    """
+    Méthode explicite de tableau (a, b) sur steps pas de longueur h, pour un seul jeu de paramètres.
+    a est carré ((étages - 1) x (étages - 1)), complété par des zéros.
+    Retourne un tableau (steps // every + 1, compartiments) : un point tous les every pas.
+    """
+    n = len(y0)
+    y = np.empty((steps // every + 1, n))
+    y[0] = y0
+    current = y0.copy()
+    padded = np.ones(n + 1)
+    rates = np.empty(len(coefficients))
+    stages = np.empty((len(b), n))
+    stage_y = np.empty(n)
+    for o in range(1, steps + 1):
+        padded[:n] = current
+        derivative(coefficients, factors, transfer, padded, rates, stages[0])
+        for i in range(len(b) - 1):
+            combine(current, h, a[i], stages, stage_y)
+            padded[:n] = stage_y
+            derivative(coefficients, factors, transfer, padded, rates, stages[i + 1])
+        combine(current, h, b, stages, current)
+        if o % every == 0:
+            y[o // every] = current
+    return y
+
+
+@jit
+def contaminate(x, y, state, radius, healthy, exposed, infected):
+    """
+    Passe à exposed chaque personne healthy à une distance <= radius d'une personne infected.
+    Même grille uniforme que spatial.within, parcourue personne par personne.
+    """
+    sources = np.flatnonzero(state == infected)
+    if len(sources) == 0:
+        return
+    column = np.floor(x[sources] / radius).astype(np.int64)
+    row = np.floor(y[sources] / radius).astype(np.int64)
+    low_column, low_row = column.min(), row.min()
+    high_column, high_row = column.max(), row.max()
+    width = high_row - low_row + 1
+    keys = (column - low_column) * width + row - low_row
+    order = np.argsort(keys, kind="mergesort")
+    sorted_keys = keys[order]
+
+    for p in range(len(state)):
+        if state[p] != healthy:
+            continue
+        target_column = np.int64(np.floor(x[p] / radius))
+        target_row = np.int64(np.floor(y[p] / radius))
+        hit = False
+        for c in range(max(target_column - 1, low_column), min(target_column + 1, high_column) + 1):
+            for r in range(max(target_row - 1, low_row), min(target_row + 1, high_row) + 1):
+                key = (c - low_column) * width + r - low_row
+                for k in range(np.searchsorted(sorted_keys, key, side="left"),
+                               np.searchsorted(sorted_keys, key, side="right")):
+                    dx = x[p] - x[sources[order[k]]]
+                    dy = y[p] - y[sources[order[k]]]
+                    if np.sqrt(dx ** 2 + dy ** 2) <= radius:
+                        hit = True
+                        break
+                if hit:
+                    break
+            if hit:
+                break
+        if hit:
+            state[p] = exposed
+
+
+@jit
+def incubate(state, incubation, exposed, infected):
+    """
+    Décompte l'incubation des personnes exposed, qui deviennent infected à la fin.
+    """
+    for p in range(len(state)):
+        if state[p] == exposed:
+            incubation[p] -= 1
+            if incubation[p] == 0:
+                state[p] = infected
+
+
+@jit
+def lttb(x, y, edges, mean_x, mean_y, index):
+    """
+    Boucle des paquets de downsample.lttb_indices : index[k + 1] reçoit le point gardé du paquet k.
+    """
+    a = 0
+    for k in range(len(index) - 2):
+        best, area = edges[k], -1.
+        for p in range(edges[k], edges[k + 1]):
+            candidate = abs((x[a] - mean_x[k + 1]) * (y[p] - y[a]) - (x[a] - x[p]) * (mean_y[k + 1] - y[a]))
+            if candidate > area:
+                best, area = p, candidate
+        a = best
+        index[k + 1] = a
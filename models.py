@@ -0,0 +1,73 @@
+from engine import Model, Transition, births, deaths
+
+# Modèle SIR (beta non normalisé par la population, comme dans les autres modèles)
+SIR = Model(
+    "SIR",
+    compartments=("S", "I", "R"),
+    parameters=("beta", "gamma"),
+    transitions=[
+        Transition("S", "I", "beta", ("S", "I")),  # Contamination
+        Transition("I", "R", "gamma"),  # Guérison
+    ],
+)
+
+# Modèle SEIR avec natalité et mortalité naturelle
+SEIR = Model(
+    "SEIR",
+    compartments=("S", "E", "I", "R"),
+    parameters=("alpha", "beta", "gamma", "micro", "nu"),
+    transitions=[
+        Transition("S", "E", "beta", ("S", "I")),  # Contamination
+        Transition("E", "I", "alpha"),  # Incubation
+        Transition("I", "R", "gamma"),  # Guérison
+        *births("nu", "S", ("S", "E", "I", "R")),
+        *deaths("micro", ("S", "E", "I", "R")),
+    ],
+)
+
+# Modèle SEIR + personnes vaccinées
+SEIRV = Model(
+    "SEIRV",
+    compartments=("S", "E", "I", "R", "V"),
+    parameters=("alpha", "beta", "gamma", "micro", "nu", "epsilon"),
+    transitions=[
+        Transition("S", "E", "beta", ("S", "I")),  # Contamination
+        Transition("E", "I", "alpha"),  # Incubation
+        Transition("I", "R", "gamma"),  # Guérison
+        Transition("S", "V", "epsilon"),  # Vaccination des sains
+        Transition("R", "V", "epsilon"),  # Vaccination des guéris
+        *births("nu", "S", ("S", "E", "I", "R", "V")),
+        *deaths("micro", ("S", "E", "I", "R", "V")),
+    ],
+)
+
+# Modèle SEIRV + réinfection des guéris et morts liées à la maladie
+SEIGVM = Model(
+    "SEIGVM",
+    compartments=("S", "E", "I", "G", "V", "M"),
+    parameters=("alpha", "beta", "gamma", "micro", "nu", "epsilon", "delta"),
+    transitions=[
+        Transition("S", "E", "beta", ("S", "I")),  # Contamination
+        Transition("G", "E", "beta"),  # Réinfection
+        Transition("E", "I", "alpha"),  # Incubation
+        Transition("I", "G", "gamma"),  # Guérison
+        Transition("I", "M", "delta"),  # Morts de la maladie
+        Transition("S", "V", "epsilon"),  # Vaccination des sains
+        Transition("G", "V", "epsilon"),  # Vaccination des guéris
+        *births("nu", "S", ("S", "E", "I", "G", "V")),
+        *deaths("micro", ("S", "E", "I", "G", "V")),
+    ],
+)
+
+# Plages des paramètres (valmin, valmax des sliders de SEIR.py, SEIRV.py et SEIGVM.py)
+RANGES = {
+    "alpha": (0, 1),
+    "beta": (0, 1),
+    "gamma": (0, 1),
+    "micro": (0, 1),
+    "nu": (0, 0.5),
+    "epsilon": (0, 1),
+    "delta": (0, 1),
+}
+
+MODELS = {model.name: model for model in (SIR, SEIR, SEIRV, SEIGVM)}
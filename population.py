@@ -0,0 +1,97 @@
+import numpy as np
+
+import kernels
+from spatial import within
+
+# Codes d'état des personnes
+S, E, I, R = 0, 1, 2, 3
+STATES = "SEIR"
+
+
+class Population:
+    """
+    Table des personnes de la simulation, rangée en tableaux contigus (une case par personne) :
+    position (float64), vitesse (float32), état (uint8, S/E/I/R) et incubation restante (int16),
+    soit 27 octets par personne. Chaque étape de la simulation agit sur toute la table à la fois.
+    """
+
+    def __init__(self, s0, e0, i0, r0, x_len=100, y_len=100, thr=2, incubation_time=30, gamma=0.03, seed=None):
+        self.x_len, self.y_len = x_len, y_len
+        self.thr = thr
+        self.gamma = gamma
+        self.rng = np.random.default_rng(seed)
+
+        n = s0 + e0 + i0 + r0
+        self.x = self.rng.random(n) * x_len
+        self.y = self.rng.random(n) * y_len
+        self.x_vect = (self.rng.random(n) - 0.5).astype(np.float32)
+        self.y_vect = (self.rng.random(n) - 0.5).astype(np.float32)
+        self.state = np.repeat(np.array([S, E, I, R], dtype=np.uint8), [s0, e0, i0, r0])
+        self.incubation = np.full(n, incubation_time, dtype=np.int16)
+
+    def __len__(self):
+        return len(self.state)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.x, self.y, self.x_vect, self.y_vect, self.state, self.incubation))
+
+    def counts(self):
+        """
+        Nombre de personnes dans chaque état (S, E, I, R).
+        """
+        return np.bincount(self.state, minlength=4)
+
+    def move(self):
+        """
+        Déplace tout le monde et fait rebondir sur les bords ceux qui sont sortis du tableau de jeu.
+        """
+        self.x += self.x_vect
+        self.y += self.y_vect
+        out = (self.x < 0) | (self.x > self.x_len)
+        self.x_vect[out] = -self.x_vect[out]
+        out = (self.y < 0) | (self.y > self.y_len)
+        self.y_vect[out] = -self.y_vect[out]
+
+    def contaminate(self):
+        """
+        Expose chaque personne saine située à moins de thr d'une personne infectée.
+        """
+        if kernels.JIT:
+            kernels.contaminate(self.x, self.y, self.state, self.thr, S, E, I)
+            return
+        infected = self.state == I
+        healthy = np.flatnonzero(self.state == S)
+        hit = within(np.column_stack((self.x[infected], self.y[infected])),
+                     np.column_stack((self.x[healthy], self.y[healthy])), self.thr)
+        self.state[healthy[hit]] = E
+
+    def incubate(self):
+        """
+        Décompte l'incubation des personnes exposées, qui deviennent infectées à la fin.
+        """
+        if kernels.JIT:
+            kernels.incubate(self.state, self.incubation, E, I)
+            return
+        exposed = self.state == E
+        self.incubation[exposed] -= 1
+        self.state[exposed & (self.incubation == 0)] = I
+
+    def get_rekt(self):
+        """
+        Chaque personne infectée guérit avec une probabilité gamma, et s'arrête.
+        """
+        infected = np.flatnonzero(self.state == I)
+        cured = infected[self.rng.random(len(infected)) < self.gamma]
+        self.state[cured] = R
+        self.x_vect[cured] = 0
+        self.y_vect[cured] = 0
+
+    def tick(self):
+        """
+        Une étape de la simulation.
+        """
+        self.move()
+        self.contaminate()
+        self.incubate()
+        self.get_rekt()
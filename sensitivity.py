@@ -0,0 +1,256 @@
+"""
+Analyse de sensibilité globale : quels paramètres (sliders) comptent pour le pic des infectés et
+les morts finales ?
+
+Les paramètres sont tirés dans les plages des sliders (models.RANGES, valmin et valmax) et tous les
+jeux d'un plan sont résolus ensemble par sweep.py. Deux plans :
+
+- Sobol (Saltelli) : indices du premier ordre S1 (part de la variance due au paramètre seul)
+  et totaux ST (avec ses interactions), estimateurs de Saltelli (2010) et Jansen.
+  N points de base coûtent N * (paramètres + 2) résolutions ;
+- Morris : effets élémentaires le long de trajectoires en un-paramètre-à-la-fois,
+  mu* (influence moyenne) et sigma (non-linéarités, interactions), pour un criblage peu coûteux.
+
+add() ajoute des points sans refaire les précédents (la suite de Sobol doublant sa taille à chaque fois)
+et history garde les indices après chaque ajout ; confidence() donne des intervalles par bootstrap
+et converged() indique quand ils sont assez étroits.
+
+    python sensitivity.py SEIGVM --y0 995 0 5 0 0 0 --fix nu=0.009 --evaluations 100000
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy.stats import qmc
+
+from models import MODELS, RANGES
+from sweep import MEMORY_BUDGET, sweep
+
+OUTPUTS = {"peak_I": ("peak", "I"), "final_M": ("final", "M")}  # Nom : (statistique, compartiment)
+SAMPLES = 1024  # Points de base du premier ajout d'un plan de Sobol
+TRAJECTORIES = 64  # Trajectoires du premier ajout d'un plan de Morris
+LEVELS = 4  # Niveaux de la grille de Morris
+BOOTSTRAP = 100  # Rééchantillonnages des intervalles de confiance
+CONFIDENCE = 0.95
+TOLERANCE = 0.02  # Demi-largeur maximale des intervalles (indices de Sobol, mu* relatif) pour converged()
+
+
+def reduce(model, trajectories, outputs=OUTPUTS):
+    """
+    Sorties de chaque trajectoire (jeux, temps, compartiments) : tableau (jeux, sorties).
+    """
+    columns = []
+    for statistic, compartment in outputs.values():
+        curve = trajectories[:, :, model.index(compartment)]
+        columns.append(curve.max(axis=1) if statistic == "peak" else curve[:, -1])
+    return np.column_stack(columns)
+
+
+def evaluate(model, y0, params, h, steps, outputs=OUTPUTS, every=1, method="euler", memory=MEMORY_BUDGET):
+    """
+    Résout chaque ligne de params par paquets (sweep) et n'en garde que les sorties (jeux, sorties).
+    """
+    values = np.empty((len(params), len(outputs)))
+    for chunk, trajectories in sweep(model, y0, params, h, steps, every, method, memory):
+        values[chunk] = reduce(model, trajectories, outputs)
+    diverged = ~np.isfinite(values).all(axis=1)
+    if diverged.any():
+        raise ValueError(f"{diverged.sum()} résolutions sur {len(values)} divergent : réduire le pas "
+                         "ou la plage des paramètres qui font exploser la population (nu)")
+    return values
+
+
+class Design:
+    """
+    Plan d'expériences sur les paramètres du modèle absents de fixed ({paramètre: valeur}),
+    tirés entre les bornes de ranges (RANGES par défaut). Les autres arguments sont ceux de sweep.
+    """
+
+    def __init__(self, model, y0, h, steps, fixed=None, ranges=None, outputs=OUTPUTS, every=1,
+                 method="euler", seed=None):
+        self.model = model
+        self.y0 = y0
+        self.solver = {"h": h, "steps": steps, "every": every, "method": method}
+        self.fixed = dict(fixed or {})
+        ranges = {**RANGES, **(ranges or {})}
+        self.names = [p for p in model.parameters if p not in self.fixed]
+        self.low = np.array([ranges[p][0] for p in self.names], dtype=float)
+        self.high = np.array([ranges[p][1] for p in self.names], dtype=float)
+        self.outputs = dict(outputs)
+        self.rng = np.random.default_rng(seed)
+        self.evaluations = 0
+        self.history = []  # (évaluations, indices) après chaque ajout
+
+    def run(self, unit):
+        """
+        Sorties pour des points du cube unité (..., paramètres tirés) : tableau (..., sorties).
+        """
+        shape = unit.shape[:-1]
+        unit = unit.reshape(-1, len(self.names))
+        params = np.empty((len(unit), len(self.model.parameters)))
+        for j, p in enumerate(self.model.parameters):
+            if p in self.fixed:
+                params[:, j] = self.fixed[p]
+            else:
+                k = self.names.index(p)
+                params[:, j] = self.low[k] + unit[:, k] * (self.high[k] - self.low[k])
+        values = evaluate(self.model, self.y0, params, outputs=self.outputs, **self.solver)
+        self.evaluations += len(values)
+        return values.reshape(shape + (len(self.outputs),))
+
+    def interval(self, statistic, groups, bootstrap=BOOTSTRAP, level=CONFIDENCE):
+        """
+        Demi-largeur de l'intervalle de confiance de statistic(indices) par bootstrap sur groups lignes.
+        """
+        estimates = np.array([statistic(self.rng.integers(0, groups, groups)) for _ in range(bootstrap)])
+        low, high = np.nanquantile(estimates, [(1 - level) / 2, (1 + level) / 2], axis=0)
+        return (high - low) / 2
+
+
+class Sobol(Design):
+    """
+    Plan de Saltelli : matrices A et B (points de base, paramètres) tirées d'une suite de Sobol brouillée
+    et, pour chaque paramètre i, AB_i (A dont la colonne i vient de B).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sequence = qmc.Sobol(2 * len(self.names), scramble=True, seed=self.rng)
+        d, o = len(self.names), len(self.outputs)
+        self.f_a, self.f_b, self.f_ab = np.empty((0, o)), np.empty((0, o)), np.empty((0, d, o))
+
+    def add(self, n=None):
+        """
+        Ajoute n points de base (par défaut autant que déjà présents, SAMPLES au début : la taille
+        de la suite double et reste une puissance de 2, comme le demande son équilibre).
+        """
+        n = n or len(self.f_a) or SAMPLES
+        d = len(self.names)
+        points = self.sequence.random(n)
+        a, b = points[:, :d], points[:, d:]
+        ab = np.repeat(a[:, None], d, axis=1)
+        ab[:, np.arange(d), np.arange(d)] = b
+        values = self.run(np.concatenate((a[:, None], b[:, None], ab), axis=1))
+        self.f_a = np.concatenate((self.f_a, values[:, 0]))
+        self.f_b = np.concatenate((self.f_b, values[:, 1]))
+        self.f_ab = np.concatenate((self.f_ab, values[:, 2:]))
+        self.history.append((self.evaluations, self.indices()))
+        return self
+
+    def indices(self, rows=slice(None)):
+        """
+        Indices du premier ordre et totaux : deux tableaux (paramètres, sorties).
+        """
+        f_a, f_b, f_ab = self.f_a[rows][:, None], self.f_b[rows][:, None], self.f_ab[rows]
+        variance = np.var(np.concatenate((f_a, f_b)), axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            first = np.mean(f_b * (f_ab - f_a), axis=0) / variance
+            total = np.mean((f_a - f_ab) ** 2, axis=0) / (2 * variance)
+        return first, total
+
+    def confidence(self, bootstrap=BOOTSTRAP, level=CONFIDENCE):
+        """
+        Demi-largeurs des intervalles de confiance de S1 et ST (paramètres, sorties).
+        """
+        both = self.interval(lambda rows: np.stack(self.indices(rows)), len(self.f_a), bootstrap, level)
+        return both[0], both[1]
+
+    def converged(self, tolerance=TOLERANCE):
+        return all(np.nanmax(width) < tolerance for width in self.confidence())
+
+
+class Morris(Design):
+    """
+    Plan de Morris : trajectoires de paramètres + 1 points sur une grille de LEVELS niveaux par paramètre,
+    chaque pas changeant un seul paramètre de delta = LEVELS / (2 (LEVELS - 1)) (dans le cube unité).
+    """
+
+    def __init__(self, *args, levels=LEVELS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.levels = levels
+        self.delta = levels / (2 * (levels - 1))
+        self.effects = np.empty((0, len(self.names), len(self.outputs)))
+
+    def add(self, r=None):
+        """
+        Ajoute r trajectoires (par défaut autant que déjà présentes, TRAJECTORIES au début).
+        """
+        r = r or len(self.effects) or TRAJECTORIES
+        d = len(self.names)
+        start = self.rng.integers(0, self.levels // 2, (r, d)) / (self.levels - 1)
+        sign = self.rng.choice((-1., 1.), (r, d))
+        order = np.argsort(self.rng.random((r, d)), axis=1)
+        points = np.empty((r, d + 1, d))
+        points[:, 0] = np.where(sign > 0, start, start + self.delta)
+        rows = np.arange(r)
+        for k in range(d):
+            points[:, k + 1] = points[:, k]
+            points[rows, k + 1, order[:, k]] += sign[rows, order[:, k]] * self.delta
+
+        values = self.run(points)
+        effects = np.empty((r, d, len(self.outputs)))
+        steps = (values[:, 1:] - values[:, :-1]) / (sign[rows[:, None], order] * self.delta)[:, :, None]
+        effects[rows[:, None], order] = steps
+        self.effects = np.concatenate((self.effects, effects))
+        self.history.append((self.evaluations, self.statistics()[0]))
+        return self
+
+    def statistics(self, rows=slice(None)):
+        """
+        mu* (moyenne des effets en valeur absolue) et sigma (écart-type des effets), (paramètres, sorties),
+        pour une variation de toute la plage du paramètre.
+        """
+        effects = self.effects[rows]
+        return np.abs(effects).mean(axis=0), effects.std(axis=0, ddof=1)
+
+    def confidence(self, bootstrap=BOOTSTRAP, level=CONFIDENCE):
+        """
+        Demi-largeur de l'intervalle de confiance de mu* (paramètres, sorties).
+        """
+        return self.interval(lambda rows: self.statistics(rows)[0], len(self.effects), bootstrap, level)
+
+    def converged(self, tolerance=TOLERANCE):
+        # Relative au paramètre le plus influent de chaque sortie
+        return bool(np.all(self.confidence().max(axis=0) < tolerance * self.statistics()[0].max(axis=0)))
+
+
+DESIGNS = {"sobol": Sobol, "morris": Morris}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse de sensibilité globale sur les plages des sliders.")
+    parser.add_argument("model", choices=sorted(MODELS))
+    parser.add_argument("--y0", type=float, nargs="+", required=True)
+    parser.add_argument("--design", default="sobol", choices=sorted(DESIGNS))
+    parser.add_argument("--evaluations", type=int, default=100000, help="Nombre maximal de résolutions")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--fix", nargs="*", default=[], metavar="PARAM=VALEUR", help="Paramètres hors étude")
+    parser.add_argument("--outputs", nargs="+", default=[f"{s}:{c}" for s, c in OUTPUTS.values()],
+                        metavar="STAT:COMPARTIMENT", help="peak ou final, par exemple peak:I final:M")
+    parser.add_argument("--precision", type=int, default=1000)
+    parser.add_argument("--multiplier", type=int, default=50)
+    parser.add_argument("--every", type=int, default=10, help="Un point de temps gardé sur every")
+    parser.add_argument("--method", default="euler")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = MODELS[args.model]
+    fixed = {p: float(v) for p, v in (f.split("=") for f in args.fix)}
+    outputs = {f"{s}_{c}": (s, c) for s, c in (o.split(":") for o in args.outputs)}
+    design = DESIGNS[args.design](model, args.y0, 1 / args.precision, args.precision * args.multiplier, fixed,
+                                  outputs=outputs, every=args.every, method=args.method, seed=args.seed)
+    start = time.perf_counter()
+    while True:
+        design.add()
+        widths = np.nanmax(np.reshape(design.confidence(), (-1, len(outputs))), axis=0)
+        print(f"{design.evaluations} résolutions, {time.perf_counter() - start:.1f} s, "
+              f"demi-largeur maximale des intervalles : {np.round(widths, 4)}")
+        if design.converged(args.tolerance) or 2 * design.evaluations > args.evaluations:
+            break
+
+    columns = ("S1", "ST") if args.design == "sobol" else ("mu*", "sigma")
+    values = design.indices() if args.design == "sobol" else design.statistics()
+    for k, name in enumerate(outputs):
+        print(f"\n{name:<10}" + "".join(f"{c:>10}" for c in columns))
+        for j, p in enumerate(design.names):
+            print(f"{p:<10}" + "".join(f"{v[j, k]:>10.4g}" for v in values))
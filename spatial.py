@@ -0,0 +1,51 @@
+import numpy as np
+
+
+def cells(points, size):
+    """
+    Indices (colonne, ligne) de la case de côté size contenant chaque point.
+    """
+    return np.floor(np.asarray(points, dtype=float) / size).astype(np.int64)
+
+
+def within(sources, targets, radius):
+    """
+    Masque des cibles situées à une distance <= radius d'au moins une source.
+
+    Les sources sont rangées dans une grille uniforme de cases de côté radius (triées par case) :
+    seules les 9 cases autour de chaque cible sont testées, au lieu de toutes les paires.
+    Le coût est proportionnel au nombre de points et de paires proches, pas au produit des deux.
+    """
+    sources = np.asarray(sources, dtype=float).reshape(-1, 2)
+    targets = np.asarray(targets, dtype=float).reshape(-1, 2)
+    hit = np.zeros(len(targets), dtype=bool)
+    if len(sources) == 0 or len(targets) == 0:
+        return hit
+
+    source_cells, target_cells = cells(sources, radius), cells(targets, radius)
+    # Décalage pour que toutes les cases (et leurs voisines) aient des indices positifs
+    low = np.minimum(source_cells.min(axis=0), target_cells.min(axis=0)) - 1
+    source_cells -= low
+    target_cells -= low
+    width = max(source_cells[:, 1].max(), target_cells[:, 1].max()) + 2
+
+    source_keys = source_cells[:, 0] * width + source_cells[:, 1]
+    order = np.argsort(source_keys, kind="stable")
+    sorted_keys = source_keys[order]
+
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            keys = (target_cells[:, 0] + dx) * width + target_cells[:, 1] + dy
+            start = np.searchsorted(sorted_keys, keys, side="left")
+            count = np.searchsorted(sorted_keys, keys, side="right") - start
+            total = count.sum()
+            if total == 0:
+                continue
+            # Une ligne par paire (cible, source de la case voisine)
+            target_index = np.repeat(np.arange(len(targets)), count)
+            offset = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+            source_index = order[np.repeat(start, count) + offset]
+            delta = targets[target_index] - sources[source_index]
+            close = np.sqrt(delta[:, 0] ** 2 + delta[:, 1] ** 2) <= radius
+            hit[target_index[close]] = True
+    return hit
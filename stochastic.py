@@ -0,0 +1,157 @@
+"""
+Simulation stochastique des modèles à compartiments de models.py : chaque transition devient une réaction
+de propension Model.rates et de variations stoichiometry. Les effectifs sont entiers.
+
+- "ssa" : algorithme exact de Gillespie, un événement par itération ;
+- "tau" : tau-leaping adaptatif (Cao, Gillespie et Petzold 2006) : le pas tau est choisi pour que
+  chaque propension varie de moins de epsilon en relatif, et chaque réaction se produit un nombre
+  de fois tiré selon une loi de Poisson. Là où ce pas ne couvrirait que quelques événements,
+  la réplique fait un pas exact à la place.
+
+Toutes les répliques avancent ensemble (tableaux (compartiments, répliques)) avec un seul
+numpy.random.Generator : une itération coûte O(transitions x répliques), quelle que soit la population.
+
+    python stochastic.py --replicates 2000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from models import MODELS
+
+EPSILON = 0.03  # Variation relative tolérée des propensions pendant un saut
+SSA_FACTOR = 10  # Un saut plus court que SSA_FACTOR / propension totale est remplacé par un pas exact
+MINOR = 0.05  # Une épidémie dont le pic reste sous cette fraction de la population est dite mineure
+
+
+def reactant_orders(model):
+    """
+    Ordre de la réaction d'ordre le plus élevé où chaque compartiment est facteur (0 s'il n'en est aucun).
+    """
+    n = len(model.compartments)
+    orders = np.zeros(n)
+    for factors in model.factors:
+        present = factors[factors < n]
+        orders[present] = np.maximum(orders[present], len(present))
+    return orders
+
+
+def leap_size(model, y, a, orders, epsilon=EPSILON):
+    """
+    Pas tau de chaque réplique : la moyenne et la variance de la variation de chaque compartiment
+    pendant tau restent sous max(epsilon * x / g, 1) (g : ordre du compartiment).
+    """
+    transfer = model.stoichiometry.T
+    mean = transfer @ a
+    variance = (transfer ** 2) @ a
+    bound = np.maximum(epsilon * y / np.maximum(orders, 1)[:, None], 1.)
+    with np.errstate(divide="ignore"):
+        tau = np.minimum(np.where(mean != 0, bound / np.abs(mean), np.inf),
+                         np.where(variance > 0, bound ** 2 / variance, np.inf))
+    tau[orders == 0] = np.inf
+    return tau.min(axis=0)
+
+
+def simulate(model, y0, params, t, replicates=1, method="tau", epsilon=EPSILON, seed=None):
+    """
+    Simule replicates répliques depuis y0 (effectifs entiers) et relève les effectifs aux instants t
+    (croissants, t[0] = instant initial). params est de forme (paramètres,) ou (paramètres, répliques).
+    Retourne un tableau d'entiers (len(t), compartiments, répliques).
+    """
+    if method not in ("ssa", "tau"):
+        raise ValueError(f"Méthode inconnue : {method!r} (ssa ou tau)")
+    rng = np.random.default_rng(seed)
+    t = np.asarray(t, dtype=float)
+    params = np.asarray(params, dtype=float)
+    n = len(model.compartments)
+    orders = reactant_orders(model)
+
+    y = np.array(np.broadcast_to(np.asarray(y0, dtype=float).reshape(n, -1), (n, replicates)))
+    now = np.full(replicates, t[0])
+    out = np.empty((len(t), n, replicates))
+    out[0] = y
+    following = np.ones(replicates, dtype=np.intp)  # Prochain instant à relever de chaque réplique
+    active = np.arange(replicates) if len(t) > 1 else np.arange(0)
+
+    def record(replicas, until):
+        # Les instants de t strictement avant until reçoivent l'état courant
+        stop = np.searchsorted(t, until, side="left")
+        count = np.maximum(stop - following[replicas], 0)
+        if count.any():
+            rows = np.repeat(replicas, count)
+            offset = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+            out[np.repeat(following[replicas], count) + offset, :, rows] = y[:, rows].T
+            following[replicas] += count
+
+    while len(active):
+        a = model.rates(y[:, active], params if params.ndim == 1 else params[:, active])
+        total = a.sum(axis=0)
+        if method == "tau":
+            tau = np.minimum(leap_size(model, y[:, active], a, orders, epsilon), t[following[active]] - now[active])
+            leap = tau * total >= SSA_FACTOR
+        else:
+            leap = np.zeros(len(active), dtype=bool)
+
+        # Pas exacts : un événement chacun
+        exact = ~leap
+        if exact.any():
+            replicas, rates, rates_total = active[exact], a[:, exact], total[exact]
+            with np.errstate(divide="ignore"):
+                wait = rng.exponential(1., len(replicas)) / rates_total
+            event_time = now[replicas] + wait
+            record(replicas, np.minimum(event_time, np.nextafter(t[-1], np.inf)))
+            fires = event_time <= t[-1]
+            replicas, rates, rates_total = replicas[fires], rates[:, fires], rates_total[fires]
+            threshold = rng.random(len(replicas)) * rates_total
+            reaction = np.minimum((np.cumsum(rates, axis=0) < threshold).sum(axis=0), len(rates) - 1)
+            y[:, replicas] += model.stoichiometry[reaction].T
+            now[replicas] = event_time[fires]
+
+        # Sauts de Poisson, coupés aux instants de relevé ; un saut qui rendrait un effectif négatif est refait
+        # avec un pas deux fois plus court
+        if leap.any():
+            replicas, rates, tau = active[leap], a[:, leap], tau[leap]
+            pending = np.ones(len(replicas), dtype=bool)
+            while pending.any():
+                fired = rng.poisson(rates[:, pending] * tau[pending])
+                proposal = y[:, replicas[pending]] + model.stoichiometry.T @ fired
+                valid = (proposal >= 0).all(axis=0)
+                accepted = np.flatnonzero(pending)[valid]
+                y[:, replicas[accepted]] = proposal[:, valid]
+                tau[np.flatnonzero(pending)[~valid]] /= 2
+                pending[accepted] = False
+            reached = tau >= t[following[replicas]] - now[replicas]
+            now[replicas] = np.where(reached, t[following[replicas]], now[replicas] + tau)
+            record(replicas[reached], np.nextafter(now[replicas[reached]], np.inf))
+
+        active = active[following[active] < len(t)]
+    return np.rint(out).astype(np.int64)
+
+
+def minor_outbreaks(model, counts, fraction=MINOR):
+    """
+    Part des répliques dont le pic des infectés reste sous fraction de la population initiale.
+    """
+    infected = counts[:, model.index("I")]
+    return float(np.mean(infected.max(axis=0) < fraction * counts[0].sum(axis=0)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulation stochastique et probabilité d'extinction précoce.")
+    parser.add_argument("--model", default="SIR", choices=sorted(MODELS))
+    parser.add_argument("--y0", type=float, nargs="+", default=[999, 1, 0])
+    parser.add_argument("--params", type=float, nargs="+", default=[0.5 / 1000, 1 / 10],
+                        help="Par défaut, ceux de SIR.py (beta normalisé par la population)")
+    parser.add_argument("--days", type=float, default=160)
+    parser.add_argument("--replicates", type=int, default=1000)
+    parser.add_argument("--method", default="tau", choices=("ssa", "tau"))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = MODELS[args.model]
+    start = time.perf_counter()
+    counts = simulate(model, args.y0, args.params, np.linspace(0, args.days, int(args.days) + 1),
+                      args.replicates, args.method, seed=args.seed)
+    print(f"{args.replicates} répliques ({args.method}) : {time.perf_counter() - start:.2f} s")
+    print(f"épidémies mineures (pic < {MINOR:.0%} de la population) : {minor_outbreaks(model, counts):.1%}")
@@ -0,0 +1,213 @@
+"""
+Cache de résultats sur disque, partagé entre les sessions, les processus et les machines (dossier réseau).
+
+Chaque résultat est rangé sous l'empreinte SHA-256 de tout ce qui le détermine : définition du modèle
+(compartiments, paramètres, transitions, contacts), paramètres, état initial, grille de temps et réglages
+du solveur. Deux calculs identiques ont la même clé, où qu'ils soient lancés.
+
+- Les trajectoires sont des fichiers .npy relus par np.load(mmap_mode="r") : un succès ne copie rien,
+  les pages sont lues à la demande et partagées par tous les processus qui lisent la même entrée.
+- Une entrée est écrite dans un fichier temporaire puis renommée (os.replace, atomique) :
+  un lecteur voit l'entrée complète ou rien, et deux écrivains de la même clé écrivent le même contenu.
+- Au-delà de max_bytes, les entrées les moins récemment lues sont supprimées (sous un verrou fcntl
+  quand il existe). Un fichier supprimé reste lisible par les processus qui l'ont déjà projeté en mémoire.
+
+    python store.py ~/.cache/sir-model --max-gb 2   # état du cache, éviction
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows : éviction sans verrou (une suppression de trop ne fait que coûter un recalcul)
+    fcntl = None
+
+ROOT = os.environ.get("SIR_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "sir-model"))
+MAX_BYTES = 2 * 2**30
+LOW_WATER = 0.9  # L'éviction descend jusqu'à cette fraction de max_bytes
+STALE = 3600  # Age (s) au-delà duquel un fichier temporaire est celui d'un écrivain interrompu
+VERSION = 1  # A incrémenter si le format des entrées ou le sens d'un réglage change
+
+
+def definition(model):
+    """
+    Description canonique (JSON) d'un modèle du moteur : ce qui détermine ses équations.
+    """
+    return {
+        "compartments": list(model.compartments),
+        "parameters": list(model.parameters),
+        "transitions": [[t.source, t.target, t.param, list(t.factors)] for t in model.transitions],
+        "contacts": None if model.contacts is None else model.contacts.tolist(),
+    }
+
+
+def key(model, y0, params, t, solver):
+    """
+    Empreinte hexadécimale d'un calcul. Les tableaux sont hachés en float64 au bit près ;
+    solver est un dictionnaire sérialisable en JSON (méthode, pas, tolérances...).
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({"version": VERSION, "model": definition(model), "solver": solver},
+                             sort_keys=True).encode())
+    for array in (y0, params, t):
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        digest.update(repr(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class Store:
+    """
+    Cache dans le dossier root : root/ab/abcdef....npy, et ses métadonnées JSON dans root/ab/abcdef....json.
+    """
+
+    def __init__(self, root=ROOT, max_bytes=MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+    def __repr__(self):
+        return f"Store({self.root!r}, max_bytes={self.max_bytes})"
+
+    def path(self, key, extension=".npy"):
+        return os.path.join(self.root, key[:2], key + extension)
+
+    def get(self, key):
+        """
+        (trajectoire en lecture seule projetée en mémoire, métadonnées) ou None si la clé est absente.
+        """
+        path = self.path(key)
+        try:
+            array = np.load(path, mmap_mode="r")
+            # Ecrites avant la trajectoire, supprimées après elle : si elles manquent, l'entrée est en cours
+            # d'éviction
+            with open(self.path(key, ".json")) as f:
+                meta = json.load(f)
+            os.utime(path)  # Date de dernière lecture, pour l'éviction
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return array, meta
+
+    def write(self, path, save):
+        """
+        Ecrit path d'un coup : save(fichier) remplit un fichier temporaire du même dossier, renommé ensuite.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as f:
+                save(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, path)
+        except PermissionError:
+            # Windows : l'entrée existe déjà et est projetée par un lecteur ; elle a le même contenu
+            os.remove(temporary)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def put(self, key, array, meta=None):
+        """
+        Range array (et les métadonnées JSON meta) sous key, fait de la place si besoin
+        et retourne l'entrée relue comme par get.
+        """
+        # Les métadonnées d'abord : une trajectoire visible a toujours les siennes
+        self.write(self.path(key, ".json"), lambda f: f.write(json.dumps(meta or {}).encode()))
+        self.write(self.path(key), lambda f: np.save(f, np.ascontiguousarray(array), allow_pickle=False))
+        # Projetée avant l'éviction : elle reste lisible même si un autre processus la supprime aussitôt
+        try:
+            array = np.load(self.path(key), mmap_mode="r")
+        except FileNotFoundError:
+            # Déjà évincée par un autre processus (cache presque plein) : on rend le résultat calculé
+            array = np.array(array)
+            array.flags.writeable = False
+        self.evict()
+        return array, dict(meta or {})
+
+    def fetch(self, key, compute):
+        """
+        Entrée de key, calculée par compute() -> (array, meta) et rangée si elle est absente.
+        """
+        found = self.get(key)
+        if found is not None:
+            return found
+        return self.put(key, *compute())
+
+    def entries(self):
+        """
+        Liste de (date de dernière lecture, taille, chemin) des trajectoires ; supprime au passage
+        les fichiers temporaires abandonnés.
+        """
+        now = time.time()
+        entries = []
+        for directory in os.scandir(self.root):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                try:
+                    stat = entry.stat()
+                    if entry.name.endswith(".tmp") and now - stat.st_mtime > STALE:
+                        os.remove(entry.path)
+                    elif entry.name.endswith((".npy", ".json")):
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                except FileNotFoundError:
+                    continue
+        return entries
+
+    def evict(self):
+        """
+        Si le cache dépasse max_bytes, supprime les entrées les moins récemment lues
+        jusqu'à LOW_WATER * max_bytes. Retourne le nombre d'octets libérés.
+        """
+        with open(os.path.join(self.root, "lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return 0
+            freed = 0
+            sizes = {}
+            for _, size, path in entries:
+                stem = os.path.splitext(path)[0]
+                sizes[stem] = sizes.get(stem, 0) + size
+            used = {os.path.splitext(path)[0]: mtime for mtime, _, path in entries if path.endswith(".npy")}
+            for stem in sorted(sizes, key=lambda s: used.get(s, 0)):
+                if total - freed <= LOW_WATER * self.max_bytes:
+                    break
+                try:
+                    for extension in (".npy", ".json"):
+                        if os.path.exists(stem + extension):
+                            os.remove(stem + extension)
+                except (FileNotFoundError, PermissionError):
+                    # Déjà supprimée par un autre processus, ou encore ouverte (Windows)
+                    continue
+                freed += sizes[stem]
+            return freed
+
+    def stats(self):
+        entries = self.entries()
+        return {"hits": self.hits, "misses": self.misses, "entries": sum(p.endswith(".npy") for _, _, p in entries),
+                "bytes": sum(size for _, size, _ in entries), "max_bytes": self.max_bytes}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Etat et éviction du cache de résultats.")
+    parser.add_argument("root", nargs="?", default=ROOT)
+    parser.add_argument("--max-gb", type=float, default=MAX_BYTES / 2**30)
+    args = parser.parse_args()
+
+    store = Store(args.root, int(args.max_gb * 2**30))
+    freed = store.evict()
+    stats = store.stats()
+    print(f"{store} : {stats['entries']} entrées, {stats['bytes'] / 2**20:.1f} Mo ({freed / 2**20:.1f} Mo libérés)")
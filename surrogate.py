@@ -0,0 +1,153 @@
+import argparse
+import itertools
+import json
+
+import numpy as np
+
+from integrators import integrate
+from models import MODELS, RANGES
+from sweep import sweep
+
+POINTS = 24  # Valeurs par paramètre de la grille
+SPREAD = 4  # Resserrement des valeurs près du bas de la plage (0 : espacement régulier)
+MAX_ERROR = 0.02  # Erreur relative (à la population) au-delà de laquelle une grille est refusée
+VALIDATION = 50  # Résolutions de contrôle tirées au hasard après le précalcul
+
+
+def spacing(low, high, points, spread=SPREAD):
+    """
+    points valeurs de low à high, resserrées exponentiellement près de low : les trajectoires
+    changent le plus vite pour les petits taux (un taux qui passe de 0 à 0.05 déclenche l'épidémie).
+    """
+    u = np.linspace(0, 1, points)
+    return low + (high - low) * (np.expm1(spread * u) / np.expm1(spread) if spread else u)
+
+
+def build(path, model, y0, axes, fixed, h, steps, every=1, method="euler", tolerance=MAX_ERROR):
+    """
+    Précalcule les trajectoires du modèle sur la grille produit des axes {paramètre: valeurs}.
+    Les paramètres absents des axes prennent leur valeur dans fixed.
+    Ecrit path.npy (float32, forme (*grille, points de temps, compartiments)) et path.json (description),
+    puis mesure l'erreur d'interpolation (Surrogate.validate), enregistrée avec tolerance dans path.json.
+    Retourne cette mesure.
+    """
+    names = [p for p in model.parameters if p in axes]
+    shape = tuple(len(axes[p]) for p in names)
+    mesh = np.meshgrid(*(np.asarray(axes[p], dtype=float) for p in names), indexing="ij")
+    params = np.empty((int(np.prod(shape)), len(model.parameters)))
+    for j, p in enumerate(model.parameters):
+        params[:, j] = mesh[names.index(p)].ravel() if p in axes else fixed[p]
+
+    n_saved = steps // every + 1
+    values = np.lib.format.open_memmap(path + ".npy", mode="w+", dtype=np.float32,
+                                       shape=(len(params), n_saved, len(model.compartments)))
+    for chunk, trajectories in sweep(model, y0, params, h, steps, every, method):
+        values[chunk] = trajectories
+    values.flush()
+
+    info = {"model": model.name, "y0": list(map(float, y0)), "axes": {p: list(map(float, axes[p])) for p in names},
+            "fixed": {p: float(v) for p, v in fixed.items() if p not in axes}, "shape": shape,
+            "h": h, "steps": steps, "every": every, "method": method, "tolerance": tolerance}
+    with open(path + ".json", "w") as f:
+        json.dump(info, f, indent=1)
+    info["validation"] = Surrogate(path, check=False).validate(VALIDATION)
+    with open(path + ".json", "w") as f:
+        json.dump(info, f, indent=1)
+    return info["validation"]
+
+
+class Surrogate:
+    """
+    Trajectoires précalculées par build(), projetées en mémoire et interpolées (multilinéaire)
+    entre les points de la grille. Une évaluation lit 2^d trajectoires (d axes) : son coût
+    ne dépend pas du solveur. Retourne un tableau (compartiments, points de temps), comme solve().T.
+
+    Une grille dont l'erreur mesurée au précalcul dépasse sa tolérance est refusée (ValueError) :
+    entre deux points trop espacés, un pic épidémique peut être décalé de la moitié de la population.
+    """
+
+    def __init__(self, path, check=True):
+        with open(path + ".json") as f:
+            self.info = json.load(f)
+        validation = self.info.get("validation")
+        if check and (validation is None or validation["relative"] > self.info["tolerance"]):
+            measured = "non mesurée" if validation is None else f"{validation['relative']:.1%}"
+            raise ValueError(f"Grille {path} trop approximative : erreur relative {measured}, tolérance "
+                             f"{self.info.get('tolerance', MAX_ERROR):.1%} (resserrer la grille ou fixer des paramètres)")
+        self.model = MODELS[self.info["model"]]
+        self.names = list(self.info["axes"])
+        self.axes = [np.array(self.info["axes"][p]) for p in self.names]
+        shape = tuple(self.info["shape"])
+        values = np.load(path + ".npy", mmap_mode="r")
+        self.values = values.reshape(shape + values.shape[1:])
+
+    def covers(self, params, y0, h, steps, every, method):
+        """
+        Vrai si la grille a été précalculée pour cette résolution : même état initial, même grille
+        de temps (h, steps, every), même méthode, et paramètres hors grille à leur valeur fixée.
+        """
+        info = self.info
+        if (len(y0) != len(info["y0"]) or not np.allclose(y0, info["y0"], rtol=1e-9, atol=0)
+                or not np.isclose(h, info["h"], rtol=1e-9, atol=0)
+                or (steps, every, method) != (info["steps"], info["every"], info["method"])):
+            return False
+        params = dict(zip(self.model.parameters, params))
+        return all(abs(params[p] - v) < 1e-9 for p, v in info["fixed"].items())
+
+    def __call__(self, *params):
+        params = dict(zip(self.model.parameters, params))
+        corners = []
+        for p, axis in zip(self.names, self.axes):
+            x = min(max(params[p], axis[0]), axis[-1])
+            i = min(max(np.searchsorted(axis, x, side="right") - 1, 0), len(axis) - 2)
+            w = (x - axis[i]) / (axis[i + 1] - axis[i])
+            corners.append(((i, 1 - w), (i + 1, w)))
+
+        result = np.zeros(self.values.shape[-2:])
+        for corner in itertools.product(*corners):
+            weight = np.prod([w for _, w in corner])
+            if weight:
+                result += weight * self.values[tuple(i for i, _ in corner)]
+        return result.T
+
+    def validate(self, n=VALIDATION, seed=0):
+        """
+        Compare l'interpolation à une vraie résolution en n points tirés au hasard dans la grille.
+        Retourne l'erreur absolue maximale et l'erreur relative à la population initiale.
+        """
+        info = self.info
+        rng = np.random.default_rng(seed)
+        errors = []
+        for _ in range(n):
+            params = dict(info["fixed"])
+            params.update({p: rng.uniform(axis[0], axis[-1]) for p, axis in zip(self.names, self.axes)})
+            params = [params[p] for p in self.model.parameters]
+            exact = integrate(self.model, info["y0"], params, info["h"], info["steps"], info["method"], every=info["every"])
+            errors.append(np.abs(self(*params) - exact.T).max())
+        return {"max": float(np.max(errors)), "mean": float(np.mean(errors)),
+                "relative": float(np.max(errors) / sum(info["y0"]))}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Précalcule une grille de trajectoires pour les sliders.")
+    parser.add_argument("model", choices=sorted(MODELS))
+    parser.add_argument("path", help="Fichiers path.npy et path.json")
+    parser.add_argument("--y0", type=float, nargs="+", required=True)
+    parser.add_argument("--points", type=int, default=POINTS, help="Valeurs par paramètre")
+    parser.add_argument("--fix", nargs="*", default=[], metavar="PARAM=VALEUR", help="Paramètres hors grille")
+    parser.add_argument("--precision", type=int, default=1000)
+    parser.add_argument("--multiplier", type=int, default=2)
+    parser.add_argument("--every", type=int, default=2, help="Un point de temps gardé sur every")
+    parser.add_argument("--method", default="euler")
+    parser.add_argument("--spread", type=float, default=SPREAD, help="Resserrement près de 0 (0 : régulier)")
+    parser.add_argument("--tolerance", type=float, default=MAX_ERROR, help="Erreur relative acceptée")
+    args = parser.parse_args()
+
+    model = MODELS[args.model]
+    fixed = {p: float(v) for p, v in (f.split("=") for f in args.fix)}
+    axes = {p: spacing(*RANGES[p], args.points, args.spread) for p in model.parameters if p not in fixed}
+    validation = build(args.path, model, args.y0, axes, fixed, 1 / args.precision, args.precision * args.multiplier,
+                       args.every, args.method, args.tolerance)
+    print(validation)
+    if validation["relative"] > args.tolerance:
+        print(f"Erreur relative {validation['relative']:.1%} > {args.tolerance:.1%} : grille refusée par Surrogate")
@@ -0,0 +1,85 @@
+import numpy as np
+
+from integrators import Stepper
+
+# Mémoire maximale des trajectoires sauvegardées d'un paquet de jeux de paramètres (en octets)
+MEMORY_BUDGET = 256 * 2**20
+# Taille visée des tampons d'un pas (étages, débits) d'un paquet : ils sont relus à chaque pas et doivent
+# rester dans le cache (L2). Au-delà, un pas coûte le trafic mémoire ; en deçà, le surcoût Python par pas domine.
+CACHE_BUDGET = 2**20
+
+
+def groups(model):
+    return () if model.contacts is None else (len(model.contacts),)
+
+
+def broadcast(model, y0, params):
+    """
+    Met les états initiaux et les paramètres au format (n_sets, compartiments) et (n_sets, paramètres).
+    Un seul état initial (ou un seul jeu de paramètres) est répété pour tous les jeux.
+    Pour un modèle à groupes, ils ont un axe des groupes en plus : (n_sets, compartiments, groupes)
+    et (n_sets, paramètres, groupes), où l'axe des groupes des paramètres peut être de taille 1.
+    """
+    y0 = np.asarray(y0, dtype=float)
+    params = np.asarray(params, dtype=float)
+    if model.contacts is not None and params.ndim == 1:
+        params = params[:, None]
+    y0 = y0[None] if y0.ndim == 1 + len(groups(model)) else y0
+    params = params[None] if params.ndim == 1 + len(groups(model)) else params
+    n_sets = max(len(y0), len(params))
+    y0 = np.broadcast_to(y0, (n_sets, len(model.compartments)) + groups(model))
+    params = np.broadcast_to(params, (n_sets, len(model.parameters)) + groups(model))
+    return y0, params
+
+
+def chunk_size(model, n_saved, memory=MEMORY_BUDGET, cache=CACHE_BUDGET):
+    """
+    Nombre de jeux de paramètres traités ensemble : les tampons d'un pas (jusqu'à 4 étages, débits)
+    tiennent dans cache octets, et les trajectoires sauvegardées dans memory octets.
+    """
+    size = int(np.prod(groups(model), dtype=int))
+    n, k = len(model.compartments) * size, len(model.transitions) * size
+    step = 8 * (8 * (model.padding + 1) * size + 3 * k)
+    return max(1, min(cache // step, memory // (8 * (n_saved * n + step))))
+
+
+def integrate_batch(model, y0, params, h, steps, every=1, method="euler"):
+    """
+    Résout tous les jeux en même temps avec la méthode method.
+    Retourne un tableau (n_sets, steps // every + 1, compartiments[, groupes]) : un point tous les every pas.
+    """
+    # Le moteur travaille avec les compartiments sur le premier axe et les jeux sur le dernier
+    stepper = Stepper(model, np.moveaxis(params, 0, -1), method)
+    y = np.array(np.moveaxis(y0, 0, -1))
+    out = np.empty((steps // every + 1,) + y.shape)
+    out[0] = y
+    for o in range(1, steps + 1):
+        stepper.step(y, h, y)
+        if o % every == 0:
+            out[o // every] = y
+    return np.moveaxis(out, -1, 0)
+
+
+def sweep(model, y0, params, h, steps, every=1, method="euler", memory=MEMORY_BUDGET):
+    """
+    Résout le modèle pour chaque ligne de y0 / params, par paquets tenant dans memory octets.
+    Générateur de (tranche, trajectoires) : l'appelant réduit chaque paquet (pic, état final...)
+    sans jamais garder toutes les trajectoires en mémoire.
+    """
+    y0, params = broadcast(model, y0, params)
+    size = chunk_size(model, steps // every + 1, memory)
+    for start in range(0, len(y0), size):
+        chunk = slice(start, min(start + size, len(y0)))
+        yield chunk, integrate_batch(model, y0[chunk], params[chunk], h, steps, every, method)
+
+
+def solve_batch(model, y0, params, h, steps, every=1, method="euler", memory=MEMORY_BUDGET):
+    """
+    Comme sweep, mais rassemble toutes les trajectoires dans un seul tableau
+    (n_sets, steps // every + 1, compartiments).
+    """
+    y0, params = broadcast(model, y0, params)
+    out = np.empty((len(y0), steps // every + 1, len(model.compartments)) + groups(model))
+    for chunk, trajectories in sweep(model, y0, params, h, steps, every, method, memory):
+        out[chunk] = trajectories
+    return out